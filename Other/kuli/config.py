@@ -14,17 +14,25 @@ SERVER = 'duynguyen3116.cybersoft.vn:7890'
 API_VERSION = 'api/build/version'
 API_DOWNLOAD = 'api/build/download'
 API_TASK = 'api/task/info'
+API_TASKS = 'api/task/infos'
 
 
 HOME = Path.home().joinpath(NAME)
 FP_CONFIG = HOME.joinpath('config.json')
 FP_APP = HOME.joinpath('{0}.exe'.format(NAME))
+FP_TASKS = HOME.joinpath('tasks.json')
 
 FP_FILES = Path(__file__).parent.joinpath('files')
 FP_VERSION = FP_FILES.joinpath('version.txt')
 FP_CONFIG_DF = FP_FILES.joinpath('config.json')
 FP_TEMPLATE = FP_FILES.joinpath('template.xlsx')
 
+# Batch
+BATCH_WORKERS = 4
+
+# Seconds which task info in cache is used before getting again
+TASKS_TTL = 24*60*60
+
 # Directory
 DIR_SPEC = '単体テスト仕様書'
 DIR_RESULT = '単体テスト結果'
@@ -5,9 +5,14 @@ __authors__ = 'Duy Nguyen'
 __contact__ = 'duykn@gcs-vn.com'
 
 
+import json
 import logging
+import multiprocessing
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 
+import config as CONF
 import utils
 from report import Report
 
@@ -35,7 +40,95 @@ def main():
     utils.tmp_print_info(report)
 
 
+def get_testlogs(src):
+    '''Get testlogs from directory or list file, each line of list file is
+    a testlog path and optional number of bugs separated by tab'''
+    src = Path(src).absolute()
+    if src.is_dir():
+        for path in sorted(src.rglob('*.txt')):
+            tbl = '{0}_Table.html'.format(path.stem)
+            dirs = [path.parent] + list(path.parents)[2:3]
+            if any(d.joinpath(tbl).exists() for d in dirs):
+                yield path, None
+    else:
+        for line in utils.read_file(src):
+            items = line.strip().split('\t')
+            if items[0] != '':
+                number = items[1] if len(items) > 1 else None
+                yield src.parent.joinpath(items[0]), number
+
+
+def deliver(path, info, number=None):
+    '''Deliver a testlog without asking, run in worker process'''
+    report = Report(path)
+    target = utils.get_deliver_dir(info)
+
+    report.update_issue(info, number)
+    report.deliver_result(target)
+    report.xlsx_update()
+
+    return {
+        'testlog': str(path),
+        'func': report.data['func'],
+        'confirm': report.data['confirm'],
+        'issue': report.data['issue'],
+        'target': str(target)
+    }
+
+
+def batch(src, workers=CONF.BATCH_WORKERS):
+    '''Deliver all testlogs in directory or list file, print summary json'''
+    summary = {'done': [], 'failed': []}
+
+    def failed(path, e):
+        logging.error("%s: %s", path, e)
+        summary['failed'].append({'testlog': str(path), 'error': str(e)})
+
+    jobs = {}
+    for path, number in get_testlogs(src):
+        try:
+            jobs[path] = (Report.check_coverage(path), number)
+        except Exception as e:
+            failed(path, e)
+
+    tasks = utils.get_tasks_info([data for data, _ in jobs.values()])
+
+    with ProcessPoolExecutor(workers, initializer=utils.initial_batch,
+                             initargs=(utils.LOG_LEVEL,)) as executor:
+        futures = {}
+        for path, (data, number) in jobs.items():
+            info = tasks.get(utils.get_task_key(data))
+            if info is None:
+                failed(path, "Unable to get task info")
+            else:
+                future = executor.submit(deliver, path, info, number)
+                futures[future] = path
+
+        for future in as_completed(futures):
+            try:
+                summary['done'].append(future.result())
+            except Exception as e:
+                failed(futures[future], e)
+
+    print(json.dumps(summary, indent=4))
+
+    return summary
+
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+
+    if sys.argv[1:2] == ['--batch']:
+        utils.initial_batch(utils.load_config().get('logging', logging.INFO))
+        try:
+            utils.check_config()
+        except Exception as e:
+            logging.exception(e)
+            sys.exit(1)
+
+        summary = batch(sys.argv[2])
+        sys.exit(1 if summary['failed'] != [] else 0)
+
     try:
         utils.initial()
         main()
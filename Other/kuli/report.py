@@ -44,13 +44,14 @@ class Report(object):
 
         if ready is False:
             print('\nPlease resolve all issue to continue ...')
-            utils.close()
+            utils.close('Test result has issues')
 
         # Remove source if not use stub
         if self.data['stub'] == []:
             del self.files['stub']
 
-    def check_coverage(self, path):
+    @staticmethod
+    def check_coverage(path):
         logging.info("Checking test coverage '%s'", fstr(Path(path), 0))
 
         def get_value(line, char=':'):
@@ -148,7 +149,7 @@ class Report(object):
         self.files['xlsx'] = dst
 
     def xlsx_update(self):
-        '''Update unit test specification'''
+        '''Update unit test specification, workbook is loaded and saved once'''
         path = self.files['xlsx']
         logging.info("Updating unit test specification '%s'", fstr(path, 0))
 
@@ -160,6 +161,9 @@ class Report(object):
         # Update worksheet 6
         self.xlsx_update_ws6()
 
+        # Save excel
+        self.xlsx_save()
+
     def xlsx_save(self):
         path = self.files['xlsx']
         self.wb.active = 1
@@ -168,8 +172,7 @@ class Report(object):
     def xlsx_update_ws1(self):
         logging.info(fstr("Updating worksheet 1"))
 
-        self.wb.active = 1
-        ws = self.wb.active
+        ws = self.wb.worksheets[1]
 
         ws['F8'] = str(self.data['src_dir']).replace('\\', '/')
         ws['F9'] = self.data['src_name']
@@ -184,9 +187,10 @@ class Report(object):
             .format(**self.data)
         ws['F14'] = f14
 
-        # Update 1.2
+        # Update 1.2, labels are found in one scan of sheet
+        index = utils.index_cells(ws)
         for label, text in CONF.XLS_LABEL.items():
-            row, col = utils.find_cell(ws, text)
+            row, col = index.get(text, (0, 0))
             lb_data = self.tctbl.label_data.get(label, {})
 
             # r, c = utils.find_cell_next(ws, row, col, count_next=1)
@@ -204,14 +208,10 @@ class Report(object):
                 #     ws.cell(row, col + 6, utils.collapse_list(lst))
                 #     i += 1
 
-        # Save excel
-        self.xlsx_save()
-
     def xlsx_update_ws6(self):
         logging.info(fstr("Updating worksheet 6"))
 
-        self.wb.active = 6
-        ws = self.wb.active
+        ws = self.wb.worksheets[6]
 
         lines = [l.replace('\n', '')
                  for l in utils.read_file(self.files['txt'])]
@@ -221,11 +221,8 @@ class Report(object):
             cell = 'A{0}'.format(row + i)
             ws[cell] = lines[i]
 
-        # Save excel
-        self.xlsx_save()
-
-    def update_issue(self, info):
-        '''Update issue information'''
+    def update_issue(self, info, number=None):
+        '''Update issue information, number of bugs is asked if not given'''
         if (
             self.data['c0'] != '100%' or
             self.data['c1'] != '100%' or
@@ -234,7 +231,10 @@ class Report(object):
             self.data['confirm'] = 'NG'
 
         if self.data['confirm'] == 'NG':
-            number = input('\nFound <number> bugs: ')
+            if number is None and utils.BATCH:
+                raise Exception("Number of bugs is required for NG")
+            elif number is None:
+                number = input('\nFound <number> bugs: ')
             number = int(number)
             lst = ['{0}.{1}'.format(info['func_no'], i+1)
                    for i in range(number)]
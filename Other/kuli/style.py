@@ -8,8 +8,8 @@ __contact__ = 'duykn@gcs-vn.com'
 import logging
 
 
-from openpyxl.styles import (Alignment, Border, Font, PatternFill, Protection,
-                             Side)
+from openpyxl.styles import (Alignment, Border, Font, NamedStyle, PatternFill,
+                             Protection, Side)
 from openpyxl.styles.fills import FILL_SOLID
 
 
@@ -109,6 +109,15 @@ class Style(object):
         self.protection = Protection(locked=False,
                                      hidden=False)
 
+    def get_named_style(self, name):
+        '''Get named style which can be shared by cells.
+        Same attributes as were set to each cell'''
+        return NamedStyle(name=name,
+                          font=self.font,
+                          fill=self.fill,
+                          border=self.border,
+                          alignment=self.alignment)
+
     def rgb2hex(self, string):
         char = ','
         rgb = [int(s) for s in string[4:-1].split(char)]
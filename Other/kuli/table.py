@@ -5,7 +5,10 @@ __authors__ = 'Duy Nguyen'
 __contact__ = 'duykn@gcs-vn.com'
 
 
+import hashlib
 import logging
+import weakref
+from types import MappingProxyType
 from unicodedata import normalize
 
 import cssutils
@@ -46,12 +49,19 @@ class Base(object):
 
 class Table(Base):
 
+    # Parsed stylesheets by hash of content, all html of WinAMS share one
+    stylesheets = {}
+
+    # Named style of resolved css of td by workbook, keyed on id of the css
+    # which is kept alive by stylesheets
+    xlsx_styles = weakref.WeakKeyDictionary()
+
     def __init__(self, path):
         super().__init__(path)
         self.doc = lxml.html.parse(str(path))
         self.table = self.get_table()
 
-        self.css = self.get_css()
+        self.css, self.css_td = self.get_css()
 
     def get_title(self):
         '''Get title of page'''
@@ -107,7 +117,8 @@ class Table(Base):
             self.add_error('Missing column', dsc)
 
     def get_css(self):
-        '''Convert css rule to dict'''
+        '''Convert css rule to dict.
+        Return rules and cache of resolved style of td by class'''
         def parse_line(text, char=':'):
             lst = text.split(char)
             return lst[0].strip(), char.join(lst[1:]).strip()
@@ -122,6 +133,15 @@ class Table(Base):
         try:
             node = self.doc.find('head/style')
             csstext = node.text_content()
+        except Exception as e:
+            logging.exception(e)
+            csstext = ''
+
+        key = hashlib.sha1(csstext.encode('utf-8')).hexdigest()
+        if key in Table.stylesheets:
+            return Table.stylesheets[key]
+
+        try:
             lst_rule = cssutils.parseString(csstext)
 
             data = {}
@@ -136,21 +156,29 @@ class Table(Base):
 
             data = {}
 
-        return data
+        Table.stylesheets[key] = (data, {})
+        return Table.stylesheets[key]
 
     def get_css_td(self, node):
-        '''Get style of node'''
-        tdstyle = 'td.{0}'.format(node.get('class'))
+        '''Get style of node, cascade is resolved once for each class'''
+        cls = node.get('class')
+        try:
+            return self.css_td[cls]
+        except KeyError:
+            pass
 
-        style = self.css.get('body')
-        style.update(self.css.get('table'))
-        style.update(self.css.get('td'))
-        style.update(self.css.get(tdstyle))
+        style = {}
+        for selector in ['body', 'table', 'td', 'td.{0}'.format(cls)]:
+            style.update(self.css.get(selector.lower(), {}))
 
-        return style
+        self.css_td[cls] = MappingProxyType(style)
+        return self.css_td[cls]
 
     def write_xlsx(self, ws, row=3):
-        '''Write html table to excel'''
+        '''Write html table to excel.
+        Cells are written one by one, ws.append of openpyxl also creates
+        each cell and can not start at row or leave merged cells out'''
+        widths = {}
 
         for r in range(len(self.table)):
             for c in range(len(self.table[r])):
@@ -158,12 +186,16 @@ class Table(Base):
                 if (r, c) != self.get_origin(node):
                     continue
 
-                self.write_xlsx_cell(ws, node, row)
-                print('.', end='')
+                self.write_xlsx_cell(ws, node, row, widths)
+            print('.', end='')
         else:
             print('.')
 
-    def write_xlsx_cell(self, ws, node, row):
+        # Column width, last cell of column wins
+        for letter, width in widths.items():
+            ws.column_dimensions[letter].width = width
+
+    def write_xlsx_cell(self, ws, node, row, widths=None):
         '''Write cell to excel'''
         r, c = self.get_origin(node)
         row = r + row
@@ -179,24 +211,44 @@ class Table(Base):
 
         cell.value = value
 
-        # Apply style
-        cell_style = Style(self.get_css_td(node))
-        cell.font = cell_style.font
-        cell.fill = cell_style.fill
-        cell.border = cell_style.border
-        cell.alignment = cell_style.alignment
+        # Apply style, named style of css class is created once per workbook
+        cell.style = self.get_xlsx_style(ws.parent, node)
 
         # Merge cells
-        end_row = row + int(node.get('rowspan', 1)) - 1
-        end_col = col + int(node.get('colspan', 1)) - 1
-        ws.merge_cells(start_row=row, start_column=col,
-                       end_row=end_row, end_column=end_col)
+        rowspan = int(node.get('rowspan', 1))
+        colspan = int(node.get('colspan', 1))
+        if rowspan > 1 or colspan > 1:
+            ws.merge_cells(start_row=row, start_column=col,
+                           end_row=row + rowspan - 1,
+                           end_column=col + colspan - 1)
 
         # Column width
         width = node.get('width')
         if width is not None:
             width = int(width) * 8.11 / 52
-            ws.column_dimensions[cell.column_letter].width = width
+            if widths is None:
+                ws.column_dimensions[cell.column_letter].width = width
+            else:
+                widths[cell.column_letter] = width
+
+    def get_xlsx_style(self, wb, node):
+        '''Get name of style of node, added to workbook at first use.
+        Name is keyed on resolved css, same class of other pages may differ'''
+        css = self.get_css_td(node)
+        styles = Table.xlsx_styles.setdefault(wb, {})
+        try:
+            return styles[id(css)]
+        except KeyError:
+            pass
+
+        key = repr(sorted(css.items())).encode('utf-8')
+        name = 'td.{0}.{1}'.format(node.get('class'),
+                                   hashlib.sha1(key).hexdigest()[:8])
+        if name not in wb.named_styles:
+            wb.add_named_style(Style(css).get_named_style(name))
+
+        styles[id(css)] = name
+        return name
 
 
 class Testcase(Table):
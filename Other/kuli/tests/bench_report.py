@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+'''Time update of unit test specification on template.
+
+    python -m tests.bench_report [template.xlsx] [--lines N] [--repeat N]
+
+Previous update loaded the workbook, scanned sheet for each label and saved
+after each worksheet'''
+
+
+__authors__ = 'Duy Nguyen'
+__contact__ = 'duykn@gcs-vn.com'
+
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+import config as CONF
+import utils
+from report import Report
+
+
+def new_report(path, txt):
+    '''Report of xlsx without result files'''
+    class Table(object):
+        label_data = {'div_zero_p2': {'cmt': [1, 2]}}
+
+    report = Report.__new__(Report)
+    report.data = {'src_dir': 'src/dir', 'src_name': 'src.c', 'func': 'f',
+                   'confirm': 'OK', 'c0': '100%', 'c1': '100%',
+                   'mcdc': '100%', 'issue': '-'}
+    report.files = {'xlsx': path, 'txt': txt}
+    report.tctbl = Table()
+    report.wb = None
+    return report
+
+
+def update_previous(report):
+    '''Update by scan for each label and save for each worksheet'''
+    path = report.files['xlsx']
+    wb = load_workbook(path)
+    ws = wb.worksheets[1]
+    for label, text in CONF.XLS_LABEL.items():
+        row, col = utils.find_cell(ws, text)
+        ws.cell(row, col+4, '不要')
+    wb.active = 1
+    wb.save(path)
+
+    ws = wb.worksheets[6]
+    for i, line in enumerate(utils.read_file(report.files['txt'])):
+        ws['A{0}'.format(5 + i)] = line.replace('\n', '')
+    wb.save(path)
+
+
+def bench(template, lines, repeat=3):
+    '''Print cost of previous and current update'''
+    with tempfile.TemporaryDirectory() as temp:
+        txt = Path(temp).joinpath('f.txt')
+        txt.write_text('\n'.join(['line {0}'.format(i)
+                                  for i in range(lines)]))
+
+        # Best of runs, first run also imports modules of openpyxl
+        costs = []
+        for update in [update_previous, Report.xlsx_update]:
+            cost = []
+            for _ in range(repeat):
+                path = Path(temp).joinpath('f.xlsx')
+                shutil.copy(str(template), str(path))
+                report = new_report(path, txt)
+
+                start = time.perf_counter()
+                update(report)
+                cost.append(time.perf_counter() - start)
+            costs.append(min(cost))
+
+        wb = load_workbook(template)
+        ws = wb.worksheets[1]
+        start = time.perf_counter()
+        for text in CONF.XLS_LABEL.values():
+            utils.find_cell(ws, text)
+        scan = time.perf_counter() - start
+        start = time.perf_counter()
+        utils.index_cells(ws)
+        index = time.perf_counter() - start
+
+    print('{0}: {1} testlog lines'.format(Path(template).name, lines))
+    print('  previous {0:.3f}s, xlsx_update {1:.3f}s'.format(*costs))
+    print('  find_cell of labels {0:.4f}s, index_cells {1:.4f}s'.format(
+        scan, index))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('template', nargs='?', default=str(CONF.FP_TEMPLATE))
+    parser.add_argument('--lines', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    bench(args.template, args.lines, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+
+__authors__ = 'Duy Nguyen'
+__contact__ = 'duykn@gcs-vn.com'
+
+
+import unittest
+
+from openpyxl import Workbook, load_workbook
+
+import config as CONF
+import utils
+
+
+class TestIndexCells(unittest.TestCase):
+    '''Position of label by index_cells is same as find_cell'''
+
+    def assertSameCells(self, ws):
+        index = utils.index_cells(ws)
+        for label, text in CONF.XLS_LABEL.items():
+            with self.subTest(label=label):
+                self.assertEqual(index.get(text, (0, 0)),
+                                 utils.find_cell(ws, text))
+
+    def test_labels(self):
+        wb = Workbook()
+        ws = wb.active
+        texts = list(CONF.XLS_LABEL.values())
+
+        # Label, padded label, label twice in row and in later rows
+        ws.cell(2, 3, texts[0])
+        ws.cell(4, 2, ' {0} '.format(texts[1]))
+        ws.cell(5, 2, texts[2])
+        ws.cell(5, 6, texts[2])
+        ws.cell(6, 2, texts[3])
+        ws.cell(9, 4, texts[3])
+        ws.cell(9, 7, texts[4])
+        ws.cell(10, 1, texts[4])
+        ws.cell(10, 3, None)
+        ws.cell(11, 5, '{0}!'.format(texts[5]))
+
+        self.assertSameCells(ws)
+
+    @unittest.skipUnless(CONF.FP_TEMPLATE.is_file(), 'No template')
+    def test_template(self):
+        wb = load_workbook(CONF.FP_TEMPLATE)
+        self.assertSameCells(wb.worksheets[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
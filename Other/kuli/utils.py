@@ -11,6 +11,7 @@ import json
 import logging
 import shutil
 import sys
+import time
 import winreg
 from pathlib import Path
 
@@ -20,6 +21,7 @@ import config as CONF
 
 LOG_LEVEL = logging.INFO
 FONT_NAME = 'Courier New'
+BATCH = False
 
 
 FORMAT_DEBUG = '%(asctime)s [%(funcName)s] %(levelname)-5s %(message)s'
@@ -63,6 +65,15 @@ def initial():
     print(banner)
 
 
+def initial_batch(level=LOG_LEVEL):
+    '''Initial batch mode, nothing waits for user'''
+    global LOG_LEVEL, BATCH
+
+    LOG_LEVEL = level
+    BATCH = True
+    set_console_log(LOG_LEVEL)
+
+
 def install():
     '''Install Kuli to home directory'''
     msg = "Do you want to install {0}".format(CONF.NAME)
@@ -83,6 +94,9 @@ def install():
 
 def confirm(msg):
     '''Confirm to continue'''
+    if BATCH:
+        return
+
     msg = '{0} (y/n)? '.format(msg)
     option = input(msg)
     if option.lower() not in ['y']:
@@ -188,8 +202,11 @@ def upgrade_build():
             logging.exception(e)
 
 
-def close():
-    '''Keep console'''
+def close(msg='Unable to continue'):
+    '''Keep console, stop current testlog in batch mode'''
+    if BATCH:
+        raise Exception(msg)
+
     upgrade_build()
 
     print('\nPress any key to exit')
@@ -273,6 +290,69 @@ def get_task_info(data, api=CONF.API_TASK):
         close()
 
 
+def get_task_key(data):
+    '''Key of function in task info cache'''
+    return '{0}/{1}/{2}'.format(
+        data['package'], data['src_rel'].replace('\\', '/'), data['func'])
+
+
+def get_tasks_info(lst_data, api=CONF.API_TASKS):
+    '''Get task info of functions from cache, the rest from server in one
+    request or by each function if server does not support it.
+    Task info in cache is got again after CONF.TASKS_TTL seconds'''
+    try:
+        with open(CONF.FP_TASKS, encoding='utf-8') as fp:
+            cache = json.load(fp)
+    except Exception:
+        cache = {}
+
+    now = time.time()
+    cache = {key: item for key, item in cache.items()
+             if isinstance(item, dict) and
+             now - item.get('time', 0) < CONF.TASKS_TTL}
+
+    keys = [get_task_key(data) for data in lst_data]
+    missing = [data for key, data in zip(keys, lst_data)
+               if key not in cache]
+    logging.info("Getting task info of %s functions, %s cached",
+                 len(keys), len(keys) - len(missing))
+
+    if missing != []:
+        infos = {}
+        try:
+            lst = [{
+                'src_rel': data['src_rel'].replace('\\', '/'),
+                'func': data['func'],
+                'package': data['package'],
+                'username': getpass.getuser()
+            } for data in missing]
+
+            r = requests.post(get_url(api), json=lst)
+            if r.status_code == 200 and len(r.json()) == len(lst):
+                infos = {get_task_key(data): info
+                         for data, info in zip(missing, r.json())}
+
+        except Exception as e:
+            logging.debug("Bulk task info is not available %s", e)
+
+        for data in missing:
+            key = get_task_key(data)
+            info = infos.get(key)
+            try:
+                if (not isinstance(info, dict) or 'error' in info.keys() or
+                        None in info.values()):
+                    info = get_task_info(data)
+                cache[key] = {'time': now, 'info': info}
+            except Exception as e:
+                logging.error("%s: %s", key, e)
+
+        CONF.FP_TASKS.parent.mkdir(parents=True, exist_ok=True)
+        with open(CONF.FP_TASKS, 'w', encoding='utf-8') as fp:
+            json.dump(cache, fp, ensure_ascii=False, indent=4)
+
+    return {key: dict(cache[key]['info']) for key in keys if key in cache}
+
+
 def get_deliver_dir(info):
     '''Get deliver directory at GCS'''
     try:
@@ -303,6 +383,21 @@ def find_cell(ws, content):
     return row, col
 
 
+def index_cells(ws):
+    '''Index cells by content in one scan, same position as find_cell'''
+    logging.debug("Indexing cells of '%s'", ws.title)
+    index = {}
+    for r in ws.iter_rows():
+        found = set()
+        for cell in r:
+            content = str(cell.value).strip()
+            if content not in found:
+                found.add(content)
+                index[content] = (cell.row, cell.column)
+
+    return index
+
+
 def collapse_list(lst):
     '''Collapse'''
     def text(a, b):
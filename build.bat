@@ -4,6 +4,7 @@ git rev-list --all --count >> lila.git
 
 REM Generate build.spec
 python build.py
+if errorlevel 1 goto clean
 
 REM Build exe file
 pyinstaller build.spec
@@ -11,6 +12,7 @@ pyinstaller build.spec
 REM Restore old version.json
 copy /y lila.version mickey\\lila\\assets\\version.json
 
+:clean
 REM Clean
 if exist build.spec del build.spec
 if exist lila.git del lila.git
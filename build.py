@@ -2,9 +2,15 @@
 
 
 import json
+import subprocess
 import sys
 from pathlib import Path
 
+# Startup of app, modules which must be imported at first use
+IMPORT_BUDGET = 0.6
+LAZY_MODULES = ['tkinter', 'jira', 'win32com', 'cryptography', 'requests',
+                'openpyxl', 'lxml', 'jinja2']
+
 
 def load(filepath):
     '''Load json to dict'''
@@ -24,6 +30,36 @@ def write(data, filepath):
         json.dump(data, fp, indent=4, sort_keys=True)
 
 
+def check_import_time(budget=IMPORT_BUDGET, lazy=LAZY_MODULES):
+    '''Import app as it starts with -X importtime, stop build if it is
+    over budget or imports lazy modules'''
+    cmd = [sys.executable, '-X', 'importtime', '-c', 'import app']
+    proc = subprocess.run(cmd, cwd='mickey', stderr=subprocess.PIPE,
+                          universal_newlines=True)
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            _, cumulative, name = line[12:].split('|')
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1000000
+
+    total = times.get('app', 0)
+    loaded = [m for m in lazy if m in times]
+    print('Import app: {0:.3f}s (budget {1}s)'.format(total, budget))
+
+    if loaded != []:
+        sys.exit('Imported at startup: {0}'.format(', '.join(loaded)))
+    if total > budget:
+        slow = sorted(times.items(), key=lambda t: -t[1])[1:6]
+        sys.exit('Import app is over budget\n{0}'.format(
+            '\n'.join('{0:.3f}s {1}'.format(t, m) for m, t in slow)))
+
+
+check_import_time()
+
 # Update hash to version
 verpath = './mickey/lila/assets/version.json'
 data = load(verpath)
@@ -37,6 +37,7 @@ def start_eel(mode='chrome-app'):
 if __name__ == "__main__":
     try:
         utils.merge_data()
+        utils.clean_cache()
 
         if utils.is_open_port() is True:
             utils.clean_port()
@@ -3,14 +3,14 @@
 import json
 import logging
 import shutil
+import warnings
 from datetime import datetime
 from pathlib import Path
 
-import urllib3
-
 import lila.const as CONST
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Certificate of servers is not verified, urllib3 is imported at first request
+warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 
 try:
     with open(CONST.CONFIG) as fp:
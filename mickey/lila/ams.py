@@ -1,18 +1,36 @@
 # -*- coding: utf-8 -*-
 
+import csv
 import logging
+import mmap
+import os
+import pickle
+import re
+import hashlib
+import shutil
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from unicodedata import normalize
+from uuid import uuid4
 
+import lxml.etree
 import lxml.html
 
 import lila.const as CONST
 from lila import db, parse, utils
-from lila.excel import ExcelWin32
+from lila.excel import ExcelWin32, ExcelXlsx
 from lila.utils import update_progress as wlogger
 
 logger = logging.getLogger(__name__)
 
+# Same as text_content of lxml.html, also works with nodes of iterparse
+text_content = lxml.etree.XPath('string()')
+
 
 class Base(object):
 
@@ -20,67 +38,374 @@ class Base(object):
         self.path = Path(path)
 
 
+class Grid(object):
+    '''Virtual table of html table.
+    Each position of table keeps id of cell in compact arrays'''
+
+    def __init__(self, node=None):
+        self.nrow = 0
+        self.ncol = 0
+
+        # Distinct cells and their origin, span, class, normalized text, lines
+        # Raw text is kept for cells whose html nodes are released
+        self.cells = []
+        self.classes = []
+        self.texts = []
+        self.raws = []
+        self.lines = []
+        self.row = array('i')
+        self.col = array('i')
+        self.rowspan = array('i')
+        self.colspan = array('i')
+
+        # Id of cell at each position, row by row
+        self.index = array('i')
+
+        if node is not None:
+            self.load(node)
+
+    def __len__(self):
+        return self.nrow
+
+    def __getstate__(self):
+        '''Pickle table without html nodes'''
+        self.release()
+        state = self.__dict__.copy()
+        state['cells'] = None
+        return state
+
+    def load(self, node):
+        '''Load rows of table tag'''
+        for tr in list(node):
+            self.add_row(tr)
+        self.finish()
+
+    def add_row(self, tr):
+        '''Add cells of tr tag to the end of table'''
+        if self.ncol == 0:
+            self.ncol = sum([int(td.get('colspan', 1)) for td in tr])
+
+        ncol = self.ncol
+        index = self.index
+        row = self.nrow
+        self.nrow += 1
+        self.extend(self.nrow)
+
+        col = 0
+        for td in list(tr):
+            colspan = int(td.get('colspan', 1))
+            rowspan = int(td.get('rowspan', 1))
+
+            while col < ncol and index[row*ncol + col] != -1:
+                col += 1
+
+            if col + colspan > ncol:
+                raise IndexError('Cell out of table at row {0}'.format(row))
+
+            cid = len(self.cells)
+            self.cells.append(td)
+            self.classes.append(td.get('class'))
+            self.texts.append(None)
+            self.raws.append(None)
+            self.lines.append(None)
+            self.row.append(row)
+            self.col.append(col)
+            self.rowspan.append(rowspan)
+            self.colspan.append(colspan)
+
+            if colspan == 1 and rowspan == 1:
+                index[row*ncol + col] = cid
+                continue
+
+            self.extend(row + rowspan)
+            span = array('i', [cid]) * colspan
+            for r in range(row, row + rowspan):
+                index[r*ncol + col:r*ncol + col + colspan] = span
+
+    def extend(self, nrow):
+        '''Extend empty positions to number of rows'''
+        size = nrow*self.ncol - len(self.index)
+        if size > 0:
+            self.index.extend(array('i', [-1]) * size)
+
+    def finish(self):
+        '''Remove positions of rowspan which is out of table'''
+        del self.index[self.nrow*self.ncol:]
+
+    def get_id(self, row, col):
+        '''Get id of cell at position'''
+        if not (0 <= row < self.nrow and 0 <= col < self.ncol):
+            raise IndexError('Position {0} out of table'.format((row, col)))
+        return self.index[row*self.ncol + col]
+
+    def get_class(self, row, col):
+        '''Get class of cell at position'''
+        return self.classes[self.get_id(row, col)]
+
+    def get_origin(self, row, col):
+        '''Get origin (row, col) of cell at position'''
+        cid = self.get_id(row, col)
+        return self.row[cid], self.col[cid]
+
+    def get_text(self, row, col):
+        '''Get normalized text of cell at position.
+        Text of each cell is normalized once'''
+        return self.load_text(self.get_id(row, col))
+
+    def get_lines(self, row, col):
+        '''Get text lines of cell at position which are split by br tag.
+        Return empty list if cell has no br tag'''
+        return self.load_lines(self.get_id(row, col))
+
+    def load_text(self, cid):
+        '''Get normalized text of cell by id'''
+        text = self.texts[cid]
+        if text is None:
+            raw = self.raws[cid]
+            if raw is None:
+                raw = text_content(self.cells[cid])
+            text = utils.normalize(raw)
+            self.texts[cid] = text
+            self.raws[cid] = None
+        return text
+
+    def load_lines(self, cid):
+        '''Get text lines of cell by id'''
+        lines = self.lines[cid]
+        if lines is None:
+            lines = self.split_lines(self.cells[cid])
+            self.lines[cid] = lines
+        return lines
+
+    def release(self, begin=0):
+        '''Keep raw text and lines of all cells from id, then release their
+        html nodes. Text is still normalized when it is used'''
+        for cid in range(begin, len(self.cells)):
+            if self.cells[cid] is None:
+                continue
+            if self.texts[cid] is None:
+                self.raws[cid] = str(text_content(self.cells[cid]))
+            self.load_lines(cid)
+            self.cells[cid] = None
+
+    def split_lines(self, node):
+        '''Split text of node at br tags in one walk'''
+        def walk(elem):
+            if elem.tag == 'br':
+                lines.append('')
+            elif isinstance(elem.tag, str) and elem.text:
+                lines[-1] += elem.text
+
+            for child in elem:
+                walk(child)
+                if child.tail:
+                    lines[-1] += child.tail
+
+        lines = ['']
+        walk(node)
+
+        if len(lines) == 1:
+            return []
+
+        # Same as splitlines, last br does not start new line
+        if lines[-1] == '':
+            lines.pop()
+
+        return lines
+
+
 class Table(Base):
 
+    # Tags which are kept whenever html is parsed
+    header_tags = [('h4', 0), ('a', 0)]
+
     def __init__(self, path):
         super().__init__(path)
-        self.doc = lxml.html.parse(str(path))
+        self.doc = None
+        self.digest = None
+
+        # Parsed tables and tags which are persisted in cache file
+        self.cache = {'tables': {}, 'tags': {}}
+        self.load_cache()
+
+    def parse(self):
+        '''Parse html document when it is needed'''
+        if self.doc is None:
+            logger.debug("Parse html %s", self.path.name)
+            self.doc = lxml.html.parse(str(self.path))
+
+            for tag, index in self.header_tags:
+                nodes = [e for e in self.doc.iterfind('.//{0}'.format(tag))]
+                if index < len(nodes):
+                    self.cache['tags'][(tag, index)] = self.get_node(
+                        nodes[index])
+
+        return self.doc
+
+    def get_digest(self):
+        '''Get hash of html content. Hash is looked up by path, modified time
+        and size first, file is only hashed when it is new or changed'''
+        stat = self.path.stat()
+        key = '{0}|{1}|{2}'.format(
+            self.path.resolve(), stat.st_mtime_ns, stat.st_size)
+        link = CONST.CACHE.joinpath('{0}.key'.format(
+            hashlib.sha1(key.encode('utf-8')).hexdigest()))
+
+        try:
+            if link.is_file():
+                os.utime(link)
+                return link.read_text()
+        except Exception as e:
+            logger.exception(e)
+
+        digest = utils.hash_file(self.path)
+        self.write_cache(link, digest.encode('utf-8'))
+        return digest
+
+    def get_cache_path(self):
+        '''Get cache file of html base on hash of its content'''
+        if self.digest is None:
+            self.digest = self.get_digest()
+        return CONST.CACHE.joinpath('{0}.v{1}'.format(
+            self.digest, CONST.CACHE_VERSION))
+
+    def load_cache(self):
+        '''Load parsed tables and tags from cache file'''
+        path = self.get_cache_path()
+        try:
+            if path.is_file():
+                with open(path, 'rb') as fp:
+                    self.cache = pickle.loads(zlib.decompress(fp.read()))
+
+                # Keep cache file which is still used
+                os.utime(path)
+                logger.debug("Load cache of %s", self.path.name)
+        except Exception as e:
+            logger.exception(e)
+            self.cache = {'tables': {}, 'tags': {}}
+
+    def save_cache(self):
+        '''Save parsed tables and tags to cache file'''
+        data = pickle.dumps(self.cache, pickle.HIGHEST_PROTOCOL)
+        self.write_cache(self.get_cache_path(), zlib.compress(data, 1))
+
+    def write_cache(self, path, data):
+        '''Write cache file'''
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Replace at once, other process may read the same file
+            temp = path.with_name('{0}.{1}'.format(path.name, uuid4().hex))
+            with open(temp, 'wb') as fp:
+                fp.write(data)
+            os.replace(temp, path)
+        except Exception as e:
+            logger.exception(e)
 
     def get_tag(self, tag, index=0):
         '''Get normalized text of tag base on index of tag'''
-        node = [e for e in self.doc.iterfind('.//{0}'.format(tag))][index]
-        return self.get_node(node)
+        tags = self.cache['tags']
+        if (tag, index) not in tags:
+            doc = self.parse()
+            node = [e for e in doc.iterfind('.//{0}'.format(tag))][index]
+            tags[(tag, index)] = self.get_node(node)
+            self.save_cache()
+
+        return tags[(tag, index)]
 
     def get_node(self, node, form='NFKD'):
         '''Get normalized text of node'''
-        return normalize(form, node.text_content())
+        return utils.normalize(text_content(node), form)
+
+    def stream(self):
+        '''Get first table and header tags without building whole document.
+        Rows are released as soon as their cells are added to table, reading
+        stops at the end of table. Header tags after table are got by parsing
+        when they are used'''
+        logger.debug("Stream html %s", self.path.name)
+
+        wanted = set(self.header_tags)
+        count = {tag: 0 for tag, index in wanted}
+        tags = set(count.keys())
+
+        table = None
+        grid = Grid()
+        events = lxml.etree.iterparse(
+            str(self.path), events=('start', 'end'), html=True,
+            tag=['table', 'tr'] + list(tags))
+
+        for event, elem in events:
+            if event == 'start':
+                if elem.tag == 'table' and table is None:
+                    table = elem
+                continue
 
-    def get_table(self, index=0):
-        '''Get virtual table from html base on table tag'''
-        logger.debug("Get virtual table at index %s", index)
+            if elem.tag in tags:
+                if (elem.tag, count[elem.tag]) in wanted:
+                    self.cache['tags'][(elem.tag, count[elem.tag])] = \
+                        self.get_node(elem)
+                count[elem.tag] += 1
 
-        node = [t for t in self.doc.iterfind('.//table')][index]
-        lst = [int(c.get('colspan', 1)) for c in list(node)[0]]
-        table = [[None for i in range(sum(lst))]
-                 for j in range(len(list(node)))]
+                # Tags in table are released with their row
+                if table is None:
+                    elem.clear()
 
-        row = 0
-        for tr in list(node):
-            col = 0
-            for td in list(tr):
-                colspan = int(td.get('colspan', 1))
-                rowspan = int(td.get('rowspan', 1))
+            elif elem.tag == 'tr' and elem.getparent() is table:
+                begin = len(grid.cells)
+                grid.add_row(elem)
+                grid.release(begin)
 
-                while table[row][col] is not None:
-                    col += 1
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del table[0]
 
-                td.set('origin', ','.join([str(row), str(col)]))
-                for r in range(row, row + rowspan):
-                    for c in range(col, col + colspan):
-                        table[r][c] = td
+            elif elem is table:
+                elem.clear()
+                break
+
+        if table is None:
+            raise IndexError('Table not found in {0}'.format(self.path.name))
+
+        grid.finish()
+        self.cache['tables'][0] = grid
 
-            row += 1
+    def get_table(self, index=0):
+        '''Get virtual table from html base on table tag'''
+        return self.get_tables(index)[0]
+
+    def get_tables(self, *indexes):
+        '''Get virtual tables from html base on table tags.
+        Cache file is saved once when any of tables is not cached yet'''
+        tables = self.cache['tables']
+        missing = [i for i in indexes if i not in tables]
+        if missing == []:
+            return [tables[i] for i in indexes]
+
+        if missing == [0] and self.doc is None and \
+                self.path.stat().st_size > CONST.STREAM_SIZE:
+            self.stream()
+        else:
+            nodes = [t for t in self.parse().iterfind('.//table')]
+            for index in missing:
+                logger.debug("Get virtual table at index %s", index)
+                tables[index] = Grid(nodes[index])
 
-        return table
+        self.save_cache()
+        return [tables[i] for i in indexes]
 
     def get_table_raw(self, table):
         '''Get table raw data'''
-        row = [None for c in range(len(table[0]))]
+        row = [None for c in range(table.ncol)]
         data = [row[:] for r in range(len(table))]
 
         buff = 0
         for r in range(len(table)):
             rowspan = 1
-            for c in range(len(table[0])):
-                cell = table[r][c]
-                text = self.get_node(cell)
-                if (r, c) != self.get_origin(cell):
+            for c in range(table.ncol):
+                if (r, c) != table.get_origin(r, c):
                     continue
-                string = str(lxml.html.tostring(cell))
-                if '<br>' in string:
-                    string = string.replace('<br>', '\n')[2:-6]
-                    string = ''.join(lxml.html.fromstring(string).itertext())
-                    lst = string.splitlines()
+                lst = table.get_lines(r, c)
+                if lst != []:
                     if len(lst) > rowspan:
                         for _ in range(rowspan, len(lst)):
                             data.append(row[:])
@@ -88,7 +413,7 @@ class Table(Base):
                     for k in range(len(lst)):
                         data[r+buff+k][c] = lst[k]
                 else:
-                    data[r+buff][c] = text
+                    data[r+buff][c] = table.get_text(r, c)
             buff += (rowspan - 1)
 
         r0 = row[:]
@@ -97,9 +422,35 @@ class Table(Base):
 
         return data
 
-    def get_origin(self, cell):
-        '''Get origin (row, col) of cell in table'''
-        return tuple([int(v) for v in cell.get('origin').split(',')])
+    def get_table_merges(self, table):
+        '''Get merged ranges (row, col, end row, end col) of table raw data.
+        Rows of br lines split the row, other cells of the row are merged
+        over them. Positions count from the header rows of raw data'''
+        starts = [2]
+        for r in range(len(table)):
+            height = 1
+            for c in range(table.ncol):
+                if (r, c) == table.get_origin(r, c):
+                    height = max(height, len(table.get_lines(r, c)))
+            starts.append(starts[-1] + height)
+
+        merges = []
+        for r in range(len(table)):
+            for c in range(table.ncol):
+                if (r, c) != table.get_origin(r, c):
+                    continue
+                cid = table.get_id(r, c)
+                col = c + table.colspan[cid] - 1
+                end = starts[min(r + table.rowspan[cid], len(table))] - 1
+
+                # Each line but the last one takes a row
+                top = starts[r] + max(len(table.get_lines(r, c)) - 1, 0)
+                if col > c:
+                    merges += [(k, c, k, col) for k in range(starts[r], top)]
+                if (top, c) != (end, col):
+                    merges.append((top, c, end, col))
+
+        return merges
 
 
 class FileCollection(Base):
@@ -124,9 +475,10 @@ class FileCollection(Base):
         'report_csv_jp': (2, '{testreport}.csv')
     }
 
-    def __init__(self, path):
+    def __init__(self, path, resolver=None):
         super().__init__(path)
         self.is_ams = True
+        self.resolver = Resolver() if resolver is None else resolver
 
     def get_files(self, info):
         '''Collect files'''
@@ -157,7 +509,8 @@ class FileCollection(Base):
             ('report_csv', 'report_csv_jp')
         ]
         for origin, backup in lst:
-            if result[origin].is_file() is False and result[backup].is_file():
+            if self.resolver.is_file(result[origin]) is False and \
+                    self.resolver.is_file(result[backup]):
                 result[origin] = result[backup]
 
             del result[backup]
@@ -169,7 +522,7 @@ class FileCsv(Base):
 
     def __init__(self, path):
         super().__init__(path)
-        self.content = self.load_file()
+        self.sections = self.load_file()
         self.info = self.get_func_info()
         self.init_vars, self.init_data = self.get_initial_vars()
         self.io_vars = self.get_io_vars()
@@ -270,51 +623,63 @@ class FileCsv(Base):
             return (result, '<br>'.join(exp))
 
     def load_file(self):
-        '''Load csv file'''
-        with open(self.path, encoding='shift-jis', errors='ignore') as fp:
-            return [line.strip() for line in fp.readlines()]
+        '''Load sections of csv file in one pass.
+        Whole file is read, stub lines may follow test data'''
+        sections = {'mod': None, '#InitWheneverCall': None,
+                    '#COMMENT': None, '%': []}
+
+        with open(self.path, encoding='shift-jis', errors='ignore',
+                  newline='') as fp:
+            reader = csv.reader(fp)
+            for row in reader:
+                key = row[0].lstrip() if len(row) > 0 else ''
+
+                if key.startswith('%'):
+                    sections['%'].append(row)
+
+                elif key.startswith('mod'):
+                    sections['mod'] = sections['mod'] or row
+
+                elif key.startswith('#InitWheneverCall'):
+                    # Values of initial variables are in the next line
+                    value = next(reader, [])
+                    sections['#InitWheneverCall'] = \
+                        sections['#InitWheneverCall'] or (row, value)
+
+                elif key.startswith('#COMMENT'):
+                    sections['#COMMENT'] = sections['#COMMENT'] or row
 
-    def modify_value(self, value):
-        return value[1:-1] if value.startswith('"') and value.endswith('"') else value
+        return sections
 
     def get_func_info(self):
         '''Get function info'''
-        lst = [l for l in self.content if l.startswith('mod')][0].split(',')
+        lst = self.sections['mod']
+        if lst is None:
+            raise IndexError('Not found mod line in {0}'.format(
+                self.path.name))
+
         return {
-            'func_full': self.modify_value(lst[1]),
-            'desc': self.modify_value(lst[2]),
+            'func_full': lst[1],
+            'desc': lst[2],
             'num_input': int(lst[3]),
             'num_output': int(lst[4])
         }
 
     def get_initial_vars(self):
         '''Get initial info'''
-        variable = []
-        value = []
-        for i in range(len(self.content)):
-            if self.content[i].startswith('#InitWheneverCall'):
-                variable = [self.modify_value(v)
-                            for v in self.content[i].split(',')]
-                value = self.content[i+1].split(',')
-                break
-
-        init_data = []
-        for i in range(len(variable)):
-            init_data.append([variable[i], value[i]])
-
+        variable, value = self.sections['#InitWheneverCall'] or ([], [])
+        init_data = [list(item) for item in zip(variable, value)]
         return dict(zip(variable, value)), init_data
 
     def get_io_vars(self):
         '''Get input and output variable'''
         variables = {}
-        for line in self.content:
-            if line.startswith('#COMMENT'):
-                lst = [self.modify_value(v) for v in line.split(',')]
-                variables = {
-                    'input': lst[1: (self.info['num_input'] + 1)],
-                    'output': lst[self.info['num_input'] + 1:]
-                }
-                break
+        lst = self.sections['#COMMENT']
+        if lst is not None:
+            variables = {
+                'input': lst[1: (self.info['num_input'] + 1)],
+                'output': lst[self.info['num_input'] + 1:]
+            }
 
         return variables
 
@@ -323,13 +688,11 @@ class FileCsv(Base):
         stub = []
         non_stub = []
 
-        for line in self.content:
-            if line.startswith('%'):
-                lst = [self.modify_value(v) for v in line.split(',')]
-                if lst[1] == '':
-                    non_stub.append(lst[1:])
-                else:
-                    stub.append(lst[1:])
+        for lst in self.sections['%']:
+            if lst[1] == '':
+                non_stub.append(lst[1:])
+            else:
+                stub.append(lst[1:])
 
         return {
             'stub': stub,
@@ -342,7 +705,29 @@ class FileTxt(Base):
 
     def __init__(self, path):
         super().__init__(path)
-        self.info = parse.parse_testlog(self.path)
+        self.text = self.load_file()
+        self.lines = None
+        self.info = parse.parse_testlog(self.path, self.text)
+
+    def load_file(self):
+        '''Load testlog as text. File is mapped and decoded once,
+        line breaks are same as reading in text mode'''
+        with open(self.path, 'rb') as fp:
+            if os.fstat(fp.fileno()).st_size == 0:
+                return ''
+
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                text = str(mm, 'shift-jis', 'ignore')
+
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+    def get_lines(self):
+        '''Get lines of testlog without line break'''
+        if self.lines is None:
+            self.lines = self.text.split('\n')
+            if self.lines[-1] == '':
+                self.lines.pop()
+        return self.lines
 
     def check_13_parse(self):
         '''Check able to parse testlog to get info or not'''
@@ -361,30 +746,56 @@ class FileTxt(Base):
 
     def check_14_func(self):
         '''Check testlog file is enough or not'''
+        def is_definition(line):
+            if func1 not in line and func2 not in line:
+                return False
+
+            func = func2 if func2 in line else func1
+            tmp = [block.strip() for block in line.split(func)]
+            if tmp[1].startswith('(') is False:
+                return False
+
+            tmp2 = [i.strip() for i in tmp[0].split(' ') if i.strip() != '']
+            return set(lst_char) - set(tmp2) == set(lst_char)
+
         try:
             result, exp = False, '<code>Missing function in testlog</code>'
-            lst = utils.read_file(self.path)
+            text = self.text
             lst_char = ['+', '-', '/', '=']
             func1 = ' ' + self.info['func']
             func2 = '*' + self.info['func']
-            for line in lst[6:]:
-                func = func1
-                if func1 not in line and func2 not in line:
-                    continue
 
-                if func2 in line:
-                    func = func2
+            # Only lines which have function name then ( are checked,
+            # name must not be the end of a longer name. Pattern starts
+            # with the name so it is searched fast, char before is checked
+            scan = re.compile(re.escape(self.info['func']) + r'\s*\(')
+
+            # Skip header lines of testlog
+            pos = 0
+            for i in range(6):
+                pos = text.find('\n', pos) + 1
+                if pos == 0:
+                    pos = len(text)
+                    break
 
-                tmp = [block.strip() for block in line.split(func)]
-                if tmp[1].startswith('(') is False:
+            match = scan.search(text, pos)
+            while match is not None:
+                start = match.start()
+                if start > 0 and (text[start - 1].isalnum() or
+                                  text[start - 1] == '_'):
+                    match = scan.search(text, start + 1)
                     continue
-                tmp2 = [i.strip() for i in tmp[0].split(' ')
-                        if i.strip() != '']
 
-                if set(lst_char) - set(tmp2) == set(lst_char):
+                begin = text.rfind('\n', 0, start) + 1
+                end = text.find('\n', start)
+                end = len(text) if end == -1 else end
+
+                if is_definition(text[begin:end]):
                     result, exp = True, ''
                     break
 
+                match = scan.search(text, end)
+
         except Exception as e:
             logger.exception(e)
             result, exp = None, str(e)
@@ -417,18 +828,62 @@ class FileTable(Table):
         self.iai = self.get_index_header('item')
         self.icm = self.get_index_header('comment')
 
-    def get_number(self, cell):
-        number = None
-        if cell.get('class') in self.class_no:
-            number = abs(int(self.get_node(cell)))
+        # Decoded columns of all rows, testcases of each item
+        self.columns = {}
+        self.testcases = None
+
+    def get_number(self, row):
+        '''Get testcase number of row'''
+        number = self.get_column('no')[row]
+        return None if number == -1 else number
+
+    def get_column(self, name):
+        '''Get column of all rows, each column is decoded once.
+        Error of decoding is raised on every call'''
+        if name not in self.columns:
+            self.columns[name] = self.decode_column(name)
+        return self.columns[name]
+
+    def decode_column(self, name):
+        '''Decode column of all rows.
+        no: testcase number (-1 if none), cmt_*: commented out flag,
+        origin: row of item cell, others: normalized text'''
+        logger.debug("Decode column %s", name)
+        table = self.table
+        rows = range(len(table))
+
+        if name == 'no':
+            data = array('i', [-1]) * len(table)
+            for r in rows:
+                if table.get_class(r, self.ino) in self.class_no:
+                    data[r] = abs(int(table.get_text(r, self.ino)))
+
+        elif name in ['cmt_no', 'cmt_confirm']:
+            col = self.ino if name == 'cmt_no' else self.icf
+            data = array('b', [table.get_class(r, col) in self.class_cmt
+                               for r in rows])
+
+        elif name == 'origin':
+            data = array('i', [table.get_origin(r, self.iai)[0]
+                               for r in rows])
+
+        else:
+            col = {
+                'confirm': self.icf,
+                'item': self.iai,
+                'id': self.iid,
+                'comment': self.icm
+            }[name]
+            data = [table.get_text(r, col) for r in rows]
 
-        return number
+        return data
 
     def get_index_header(self, col):
         '''Get index of header'''
         logger.debug("Get index of column %s", col)
         lst_header = utils.load(CONST.SETTING, 'headerTable.{0}'.format(col))
-        tbl_header = [self.get_node(cell) for cell in self.table[0]]
+        tbl_header = [self.table.get_text(0, c)
+                      for c in range(self.table.ncol)]
 
         headers = [h for h in lst_header if h in tbl_header]
 
@@ -436,20 +891,23 @@ class FileTable(Table):
 
     def get_testcase_data(self):
         '''Get testcase data from testcase table'''
-        logger.debug("Get testcase data")
-        data = {}
-        for row in self.table:
-            no = self.get_number(row[self.ino])
-            if no is None or row[self.ino].get('class') in self.class_cmt:
-                continue
-            item = self.get_node(row[self.iai])
+        if self.testcases is None:
+            logger.debug("Get testcase data")
+            number = self.get_column('no')
+            cmt = self.get_column('cmt_no')
+            items = self.get_column('item')
+
+            data = {}
+            for r in range(len(self.table)):
+                if number[r] == -1 or cmt[r]:
+                    continue
+                data.setdefault(items[r], []).append(number[r])
 
-            tmp = data.get(item, [])
-            tmp.append(no)
-            tmp.sort()
-            data.update({item: tmp})
+            self.testcases = {k: array('i', sorted(v))
+                              for k, v in data.items()}
 
-        return data
+        # Caller may change the lists
+        return {k: list(v) for k, v in self.testcases.items()}
 
     def get_io_vars(self):
         '''Get input/output variable in _Table.html'''
@@ -458,12 +916,12 @@ class FileTable(Table):
             'input': [],
             'output': []
         }
-        for cell in self.table[1]:
-            if cell.get('class') in self.class_input:
-                data['input'].append(self.get_node(cell))
+        for c in range(self.table.ncol):
+            if self.table.get_class(1, c) in self.class_input:
+                data['input'].append(self.table.get_text(1, c))
 
-            elif cell.get('class') in self.class_output:
-                data['output'].append(self.get_node(cell))
+            elif self.table.get_class(1, c) in self.class_output:
+                data['output'].append(self.table.get_text(1, c))
 
         return data
 
@@ -471,15 +929,15 @@ class FileTable(Table):
         '''Get confirm'''
         try:
             result = None
-            for row in self.table:
-                no = self.get_number(row[self.ino])
-                confirm = self.get_node(row[self.icf])
-
-                if row[self.icf].get('class') in self.class_cmt or no is None:
+            number = self.get_column('no')
+            confirm = self.get_column('confirm')
+            cmt = self.get_column('cmt_confirm')
+            for r in range(len(self.table)):
+                if cmt[r] or number[r] == -1:
                     continue
 
-                if confirm == 'Fault':
-                    result = confirm
+                if confirm[r] == 'Fault':
+                    result = confirm[r]
                     break
 
         except Exception as e:
@@ -491,21 +949,6 @@ class FileTable(Table):
 
     def check_15_io_var(self, data):
         '''Check input/output variable'''
-        def is_same_var(var1, var2):
-
-            result = var1 == var2
-
-            # Argument
-            if result is False:
-                result = var1.startswith('@') and var2.endswith(var1)
-
-            # Pointer
-            if result is False:
-                if var1.startswith('$') and var2.startswith('$'):
-                    result = is_same_var(var1[1:], var2[2:])
-
-            return result
-
         logger.debug("Check 15_io_var")
         try:
             result, exp = True, []
@@ -520,11 +963,11 @@ class FileTable(Table):
                     exp.append(msg)
 
                 # Check each variable
-                for i in range(len(io_vars[key])):
-                    if is_same_var(io_vars[key][i], data[key][i]) is False:
+                for i, (var1, var2) in enumerate(zip(io_vars[key], data[key])):
+                    if utils.is_same_var(var1, var2) is False:
                         result = False
                         msg = "{0} index.{1} <code>{2} != {3}</code>" \
-                            .format(key.title(), i, io_vars[key][i], data[key][i])
+                            .format(key.title(), i, var1, var2)
                         exp.append(msg)
 
             if result == False:
@@ -560,8 +1003,7 @@ class FileTable(Table):
         logger.debug("Check 8_index")
         try:
             result, exp = True, ''
-            lst = [self.get_number(row[self.ino]) for row in self.table]
-            lst = [n for n in lst if n is not None]
+            lst = [n for n in self.get_column('no') if n != -1]
 
             # Index hopping
             prev = 0
@@ -590,15 +1032,15 @@ class FileTable(Table):
         try:
             result, exp = True, ''
             lst = []
-            for row in self.table:
-                no = self.get_number(row[self.ino])
-                confirm = self.get_node(row[self.icf])
-
-                if row[self.icf].get('class') in self.class_cmt or no is None:
+            number = self.get_column('no')
+            confirm = self.get_column('confirm')
+            cmt = self.get_column('cmt_confirm')
+            for r in range(len(self.table)):
+                if cmt[r] or number[r] == -1:
                     continue
 
-                if confirm not in ['OK', 'Fault']:
-                    lst.append(no)
+                if confirm[r] not in ['OK', 'Fault']:
+                    lst.append(number[r])
 
             if lst != []:
                 result = False
@@ -615,7 +1057,8 @@ class FileTable(Table):
         logger.debug("Check 10_header")
         try:
             result, exp = True, ''
-            actual = [self.get_node(cell) for cell in self.table[0]]
+            actual = [self.table.get_text(0, c)
+                      for c in range(self.table.ncol)]
             lst = utils.load(CONST.SETTING, 'headerHtmlTable')
 
             diff = [list(set(expected) - set(actual)) for expected in lst]
@@ -635,22 +1078,29 @@ class FileTable(Table):
     def check_11_analysis(self, data):
         '''Check test analysis item mapping with data in _IE.html'''
         def is_condition(key):
+            '''Keys with same prefix are next to each other in sorted keys'''
             key = '{0}-'.format(key)
-            lst = [k for k in data.keys() if k.startswith(key)]
-            return len(lst) > 0
+            i = bisect_left(keys, key)
+            return i < len(keys) and keys[i].startswith(key)
 
         logger.debug("Check 11_analysis")
         try:
             result, exp = True, []
+            keys = sorted(data.keys())
+            number = self.get_column('no')
+            items = self.get_column('item')
+            ids = self.get_column('id')
+            comments = self.get_column('comment')
+            origin = self.get_column('origin')
+
             for i in range(len(self.table)):
-                row = self.table[i]
-                no = self.get_number(row[self.ino])
-                if no is None:
+                no = number[i]
+                if no == -1:
                     continue
 
-                item = self.get_node(row[self.iai])
-                cid = self.get_node(row[self.iid])
-                comment = self.get_node(row[self.icm])
+                item = items[i]
+                cid = ids[i]
+                comment = comments[i]
 
                 if item not in data.keys():
                     # Ignore condition analysis item
@@ -669,7 +1119,7 @@ class FileTable(Table):
                     exp.append(msg)
 
                 # Check comment column
-                r, _ = self.get_origin(row[self.iai])
+                r = origin[i]
                 if r == i and comment != data.get(item).get('comment'):
                     result = False
                     msg = 'No.{0} Comment diff <code>{1} != {2}</code>' \
@@ -711,22 +1161,22 @@ class FileIE(Table):
         logger.debug("Get analysis item from %s", self.path.name)
         data = {}
         item = {}
-        for row in self.table:
-            if row[0].get('class') not in self.class_uniqid:
+        for r in range(len(self.table)):
+            if self.table.get_class(r, 0) not in self.class_uniqid:
                 continue
 
-            sub = row[0].get('class') in self.class_uniqid_sub
+            sub = self.table.get_class(r, 0) in self.class_uniqid_sub
 
-            if row[1].get('class') in self.class_id:
+            if self.table.get_class(r, 1) in self.class_id:
                 item = {
-                    'item': self.get_node(row[0]),
-                    'id': self.get_node(row[1]),
+                    'item': self.table.get_text(r, 0),
+                    'id': self.table.get_text(r, 1),
                     'sub': sub
                 }
 
-            elif row[1].get('class') in self.class_comment:
+            elif self.table.get_class(r, 1) in self.class_comment:
                 item.update({
-                    'comment': self.get_node(row[1])
+                    'comment': self.table.get_text(r, 1)
                 })
                 data.update({
                     item.get('item'): item
@@ -738,15 +1188,15 @@ class FileIE(Table):
         logger.debug("Get variables from %s", self.path.name)
         data = []
 
-        for i in range(len(self.table[1])):
-            if (1, i) != self.get_origin(self.table[1][i]):
+        for i in range(self.table.ncol):
+            if (1, i) != self.table.get_origin(1, i):
                 continue
-            if self.table[1][i].get('class') not in self.class_kind:
+            if self.table.get_class(1, i) not in self.class_kind:
                 continue
 
-            classification = self.get_node(self.table[1][i])
-            name = self.get_node(self.table[2][i])
-            vartype = self.get_node(self.table[3][i])
+            classification = self.table.get_text(1, i)
+            name = self.table.get_text(2, i)
+            vartype = self.table.get_text(3, i)
 
             data.append([classification, name, vartype])
 
@@ -764,21 +1214,6 @@ class FileIE(Table):
 
     def check_5_input_var(self, lst):
         '''Check variables'''
-        def is_same_var(var1, var2):
-
-            result = var1 == var2
-
-            # Argument
-            if result is False:
-                result = var1.startswith('@') and var2.endswith(var1)
-
-            # Pointer
-            if result is False:
-                if var1.startswith('$') and var2.startswith('$'):
-                    result = is_same_var(var1[1:], var2[2:])
-
-            return result
-
         logger.debug("Check 5_input_var")
         try:
             result, exp = True, []
@@ -789,11 +1224,11 @@ class FileIE(Table):
                     .format(len(var), len(lst))
                 exp.append(msg)
             else:
-                for i in range(len(var)):
-                    if is_same_var(var[i], lst[i]) is False:
+                for i, (var1, var2) in enumerate(zip(var, lst)):
+                    if utils.is_same_var(var1, var2) is False:
                         result = False
                         msg = 'Index.{0} diff <code>{1} != {2}</code>' \
-                            .format(i+1, var[i], lst[i])
+                            .format(i+1, var1, var2)
                         exp.append(msg)
 
         except Exception as e:
@@ -883,16 +1318,15 @@ class FileReport(Table):
         '''Get info from tables'''
         try:
             data = {}
-            tbl_0 = self.get_table(0)
-            tbl_2 = self.get_table(2)
+            tbl_0, tbl_2 = self.get_tables(0, 2)
 
             data.update({
-                'csv': Path(self.get_node(tbl_0[0][1]).strip()).name,
-                # 'tile': self.get_node(tbl_0[1][1]).strip(),
-                # 'func_full': self.get_node(tbl_2[1][0]).strip(),
-                'c0': self.get_node(tbl_2[1][1]).strip(),
-                'c1': self.get_node(tbl_2[1][2]).strip(),
-                'mcdc': self.get_node(tbl_2[1][3]).strip()
+                'csv': Path(tbl_0.get_text(0, 1).strip()).name,
+                # 'tile': tbl_0.get_text(1, 1).strip(),
+                # 'func_full': tbl_2.get_text(1, 0).strip(),
+                'c0': tbl_2.get_text(1, 1).strip(),
+                'c1': tbl_2.get_text(1, 2).strip(),
+                'mcdc': tbl_2.get_text(1, 3).strip()
             })
 
         except Exception as e:
@@ -912,6 +1346,7 @@ class FileIO(Table):
     def __init__(self, path):
         super().__init__(path)
         self.table = self.get_table(0)
+        self.var_ai = None
 
     def get_io_vars(self):
         '''Get input/ouput variable'''
@@ -920,24 +1355,24 @@ class FileIO(Table):
             'output': []
         }
 
-        for i in range(len(self.table[2])):
-            r, c = self.get_origin(self.table[2][i])
+        for i in range(self.table.ncol):
+            r, c = self.table.get_origin(2, i)
             if (r, c) != (2, i):
                 continue
 
-            if self.table[2][i].get('class') in self.class_input:
+            if self.table.get_class(2, i) in self.class_input:
                 data['input'].append([
-                    self.get_node(self.table[2][i]),
-                    self.get_node(self.table[3][i]),
-                    self.get_node(self.table[4][i]),
+                    self.table.get_text(2, i),
+                    self.table.get_text(3, i),
+                    self.table.get_text(4, i),
                     i
                 ])
 
-            elif self.table[2][i].get('class') in self.class_output:
+            elif self.table.get_class(2, i) in self.class_output:
                 data['output'].append([
-                    self.get_node(self.table[2][i]),
-                    self.get_node(self.table[3][i]),
-                    self.get_node(self.table[4][i]),
+                    self.table.get_text(2, i),
+                    self.table.get_text(3, i),
+                    self.table.get_text(4, i),
                     i
                 ])
 
@@ -945,15 +1380,31 @@ class FileIO(Table):
 
     def get_var_ai(self, col):
         '''Get variable was used in test analysis item'''
-        data = []
-        for row in self.table:
-            if row[col].get('class') not in self.class_io_tp:
-                continue
-            text = self.get_node(row[col])
-            tmp = [i.strip() for i in text.split(',') if i.strip() != '']
-            data += tmp
-        data = sorted(list(set(data)))
-        return data
+        return list(self.get_var_ai_index().get(col, []))
+
+    def get_var_ai_index(self):
+        '''Get analysis items of all variable columns in one pass.
+        Text of each cell is split once'''
+        if self.var_ai is None:
+            logger.debug("Get analysis item of variables")
+            data = {}
+            table = self.table
+            for cid, cls in enumerate(table.classes):
+                if cls not in self.class_io_tp:
+                    continue
+
+                text = table.load_text(cid)
+                items = [i.strip() for i in text.split(',') if i.strip() != '']
+                if len(items) == 0:
+                    continue
+
+                # Cell is used by all columns which it spans
+                begin = table.col[cid]
+                for c in range(begin, begin + table.colspan[cid]):
+                    data.setdefault(c, set()).update(items)
+
+            self.var_ai = {c: sorted(v) for c, v in data.items()}
+        return self.var_ai
 
     def check_16_io_var(self, data):
         '''Check input/output variable in _IO.html vs _Table.html'''
@@ -964,10 +1415,7 @@ class FileIO(Table):
 
             for key in ['input', 'output']:
                 lst = [i[1] for i in io_vars[key]]
-                lst_all = lst + data[key]
-
-                diff = [i for i in lst_all
-                        if i not in lst or i not in data[key]]
+                diff = utils.diff_list(lst, data[key])
 
                 if diff != []:
                     result = False
@@ -994,27 +1442,42 @@ class FileOE(Table):
 class FileXlsx(Base):
     # .xlsx
 
+    # Number of different cells which are shown in checklist
+    max_diff = 5
+
     def __init__(self, path):
         super().__init__(path)
+        self.diff = {}
         self.list_sheet = parse.get_xlsx_sheets(self.path)
         self.summary = self.get_test_result()
 
     def check_html(self, sheet, data):
-        '''Compare data in excel with html'''
-        def mod(value, form='NFKD'):
+        '''Compare data in excel with html.
+        All different cells are kept in diff, only first ones are shown'''
+        def mod(value):
             try:
-                value = float(value)
-                value = 0 if value == 0 else value
+                return cache[value]
+            except KeyError:
+                pass
+
+            text = value
+            try:
+                text = float(text)
+                text = 0 if text == 0 else text
             except:
-                value = value
+                text = text
 
-            value = '' if value is None else str(value)
-            value = value.strip() if value.strip() == '' else value
-            return normalize(form, value)
+            text = '' if text is None else str(text)
+            text = text.strip() if text.strip() == '' else text
+            cache[value] = utils.normalize(text)
+            return cache[value]
 
         logger.debug("Check sheet %s", sheet)
         try:
             result, exp = True, []
+            cache = {}
+            diff = []
+            self.diff[sheet] = diff
 
             if sheet not in self.list_sheet:
                 result = False
@@ -1033,23 +1496,29 @@ class FileXlsx(Base):
                     result = False
                     exp.append(msg)
 
-                # Compare cell by cell
+                # Compare cell by cell, equal values are same after mod
                 for i in range(min(len(data), len(dxlsx))):
-                    for j in range(min(len(data[i]), len(dxlsx[i]))):
-                        cd = mod(data[i][j])
-                        cx = mod(dxlsx[i][j])
-                        if cd == cx:
+                    size = min(len(data[i]), len(dxlsx[i]))
+                    if data[i][:size] == dxlsx[i][:size]:
+                        continue
+
+                    for j in range(size):
+                        cd, cx = data[i][j], dxlsx[i][j]
+                        if cd == cx or mod(cd) == mod(cx):
                             continue
-                        else:
-                            result = False
-                            msg = "Cell [{0}x{1}] <code>{2} != {3}</code>" \
-                                .format(i+1, j+1, data[i][j], dxlsx[i][j])
-                            exp.append(msg)
-                            if len(exp) > 5:
-                                break
+                        diff.append((i+1, j+1, cd, cx))
+
+                for (i, j, cd, cx) in diff[:self.max_diff]:
+                    msg = "Cell [{0}x{1}] <code>{2} != {3}</code>" \
+                        .format(i, j, cd, cx)
+                    exp.append(msg)
 
-                    if len(exp) > 5:
-                        break
+                if len(diff) > self.max_diff:
+                    exp.append("... {0} more different cells"
+                               .format(len(diff) - self.max_diff))
+
+                if len(diff) > 0:
+                    result = False
 
                 if result is False:
                     exp = ['HTML vs XLSX'] + exp
@@ -1061,8 +1530,8 @@ class FileXlsx(Base):
         finally:
             return (result, '<br>'.join(exp))
 
-    def check_21_sheet_testlog(self, sheet, testlog):
-        '''Compare testlog sheet vs testlog txt'''
+    def check_21_sheet_testlog(self, sheet, lines):
+        '''Compare testlog sheet vs lines of testlog txt'''
         def mod(line):
             line = '' if line is None else line
             line = str(line).replace('\n', 'N').rstrip()
@@ -1095,7 +1564,7 @@ class FileXlsx(Base):
                         dxlsx.append('')
                 dxlsx = clean(dxlsx)
 
-                data = [l.replace('\n', '') for l in utils.read_file(testlog)]
+                data = list(lines)
                 intro = utils.load(CONST.SETTING, 'jpDict.testlog_intro')
                 data = [intro, '', '', ''] + data
                 data = clean(data)
@@ -1204,13 +1673,148 @@ class FileXlsx(Base):
             return data
 
 
+class Session(object):
+    '''Bounded LRU cache of parsed files.
+    Cached object is reused until the file is modified'''
+
+    def __init__(self, size=CONST.CACHE_SIZE):
+        self.size = size
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def load(self, clsname, path, stat=None):
+        '''Get parsed object of file.
+        Stat of file can be given if it is already known'''
+        path = Path(path)
+        stat = path.stat() if stat is None else stat
+        key = (clsname.__name__, str(path.absolute()))
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            item = self.data.get(key)
+            if item is not None and item[0] == stamp:
+                self.data.move_to_end(key)
+                return item[1]
+
+        logger.debug("Parse %s %s", clsname.__name__, path.name)
+        obj = clsname(path)
+
+        with self.lock:
+            self.data[key] = (stamp, obj)
+            self.data.move_to_end(key)
+            while len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+        return obj
+
+    def clear(self):
+        '''Remove all cached objects'''
+        with self.lock:
+            self.data.clear()
+
+
+# Parsed files shared by all reports in app session
+session = Session()
+
+
+class Resolver(object):
+    '''Listing of directories which are read once by scandir.
+    Existence and stat of files are answered from the listing'''
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def list_dir(self, directory):
+        '''Get files of directory by normalized name'''
+        key = os.path.normcase(os.path.abspath(directory))
+        with self.lock:
+            entries = self.data.get(key)
+
+        if entries is None:
+            logger.debug("List directory %s", Path(directory).name)
+            entries = {}
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        if entry.is_file():
+                            entries[os.path.normcase(entry.name)] = entry
+            except OSError:
+                pass
+
+            with self.lock:
+                self.data[key] = entries
+
+        return entries
+
+    def get(self, path):
+        '''Get directory entry of file, None if file does not exist'''
+        path = Path(path)
+        return self.list_dir(path.parent).get(os.path.normcase(path.name))
+
+    def is_file(self, path):
+        '''Check file exists or not'''
+        return self.get(path) is not None
+
+    def stat(self, path):
+        '''Get stat of file'''
+        entry = self.get(path)
+        return Path(path).stat() if entry is None else entry.stat()
+
+    def clear(self):
+        '''Remove all listings'''
+        with self.lock:
+            self.data.clear()
+
+
 class Report(Base):
 
-    def __init__(self, path):
+    # Check profile: (level, estimated cost of one function in second)
+    # Costs are rough seeds for a function of about 300 test cases, only used
+    # to estimate progress until a check of the profile has been measured
+    profiles = {
+        'quick': (1, 0.3),
+        'standard': (2, 1.2),
+        'full': (3, 9.0)
+    }
+
+    # Level of check item, other items are level 1
+    levels = {
+        '5_input_var': 2,
+        '6_label': 2,
+        '11_analysis': 2,
+        '12_entire': 2,
+        '15_io_var': 2,
+        '16_io_var': 2,
+        '17_sheet_io': 3,
+        '18_sheet_table': 3,
+        '19_sheet_oe': 3,
+        '20_sheet_ie': 3,
+        '21_sheet_testlog': 3,
+        '22_result_summary': 3,
+        '23_result_testlog': 3
+    }
+
+    # Measured cost of check profiles: {profile: (count, total second)}
+    costs = {}
+    cost_lock = threading.Lock()
+
+    def __init__(self, path, resolver=None, parsed=None):
         super().__init__(path)
 
-        self.info = parse.parse_testlog(self.path)
-        self.collection = FileCollection(self.path)
+        self.level = self.get_level('full')
+        self.txt = self.tctbl = self.trtbl = None
+        self.ietbl = self.iotbl = self.oetbl = self.xlsx = None
+
+        # Listing of result directories, can be shared by reports
+        self.resolver = Resolver() if resolver is None else resolver
+
+        # Parsed files, app session unless report has its own
+        self.session = session if parsed is None else parsed
+
+        stat = self.resolver.stat(self.path)
+        self.info = dict(self.session.load(FileTxt, self.path, stat).info)
+        self.collection = FileCollection(self.path, self.resolver)
 
         self.files = self.collection.get_files(self.info)
 
@@ -1229,13 +1833,47 @@ class Report(Base):
         '''Init object'''
         try:
             filepath = self.files.get(keyword)
-            if filepath != None and Path(filepath).is_file():
-                return clsname(filepath)
+            if filepath != None and self.resolver.is_file(filepath):
+                return self.session.load(clsname, filepath,
+                                    self.resolver.stat(filepath))
         except Exception as e:
             logger.exception(e)
 
-    def check(self, package):
-        '''Generate checklist'''
+    def get_level(self, profile):
+        '''Get level of check profile'''
+        return self.profiles.get(profile, self.profiles['full'])[0]
+
+    @classmethod
+    def get_cost(cls, profile):
+        '''Get cost of one function in second, measured or estimated'''
+        with cls.cost_lock:
+            count, total = cls.costs.get(profile, (0, 0))
+
+        if count > 0:
+            return total / count
+
+        return cls.profiles.get(profile, cls.profiles['full'])[1]
+
+    @classmethod
+    def add_cost(cls, profile, second):
+        '''Record measured cost of one check'''
+        with cls.cost_lock:
+            count, total = cls.costs.get(profile, (0, 0))
+            cls.costs[profile] = (count + 1, total + second)
+
+    def check(self, package, profile='full'):
+        '''Generate checklist base on check profile'''
+        logger.debug("Check with profile %s", profile)
+        self.level = self.get_level(profile)
+
+        start = time.perf_counter()
+        try:
+            self.check_items(package)
+        finally:
+            self.add_cost(profile, time.perf_counter() - start)
+
+    def check_items(self, package):
+        '''Generate checklist items up to current level'''
         # Check .txt
         try:
             self.txt = self.init(FileTxt, 'testlog')
@@ -1281,6 +1919,10 @@ class Report(Base):
         except Exception as e:
             logger.exception(e)
 
+        # Cross-file checks
+        if self.level < 2:
+            return
+
         # Check _IE.html
         try:
             self.ietbl = self.init(FileIE, 'ie')
@@ -1334,6 +1976,10 @@ class Report(Base):
         except Exception as e:
             logger.exception(e)
 
+        # Spec xlsx checks
+        if self.level < 3:
+            return
+
         # Check .xlsx
         spec_sheets = utils.load(CONST.SETTING, 'specSheets')
         self.xlsx = self.init(FileXlsx, 'xlsx')
@@ -1352,7 +1998,7 @@ class Report(Base):
                 logger.debug("Check %s %s", key, item)
                 try:
                     filepath = self.files.get(key)
-                    if filepath.is_file() is False:
+                    if self.resolver.is_file(filepath) is False:
                         rst = None, "File not found {0}".format(filepath.name)
                     else:
                         data = obj.get_table_raw(obj.table)
@@ -1366,7 +2012,7 @@ class Report(Base):
             try:
                 sheet = spec_sheets.get('testlog')
                 rst = self.xlsx.check_21_sheet_testlog(
-                    sheet, self.files.get('testlog'))
+                    sheet, self.txt.get_lines())
                 self.update_checklist('xlsx', '21_sheet_testlog', *rst)
             except Exception as e:
                 logger.exception(e)
@@ -1469,7 +2115,7 @@ class Report(Base):
     def check_files_exist(self):
         '''Check files exist or not'''
         for key, filepath in self.files.items():
-            if Path(filepath).is_file() is True:
+            if self.resolver.is_file(filepath) is True:
                 self.update_checklist(key, '1_exist', True)
             else:
                 msg = "File not found <code>{0}</code>" \
@@ -1485,30 +2131,79 @@ class Report(Base):
             if key in dct:
                 del dct[key]
 
-    def deliver_files(self, target):
-        '''Deliver files'''
+    def deliver_files(self, target, verify=False):
+        '''Deliver files, files unchanged since last delivery are skipped.
+        Unchanged is same size and mtime, or same content if verify even if
+        file is in manifest of last delivery'''
+        def is_same(src, dst, stat):
+            if dst is None or dst.stat().st_size != stat.st_size:
+                return False
+
+            # Content is always compared when verify is requested
+            if verify is True:
+                return utils.hash_file(src) == utils.hash_file(dst.path)
+
+            entry = manifest.get(src.name)
+            if entry == [stat.st_size, stat.st_mtime_ns]:
+                return True
+
+            return abs(dst.stat().st_mtime - stat.st_mtime) < 2
+
         logger.debug("Deliver files to %s", target)
         wlogger("Delivering test result files to {0}", Path(target).name, 1)
-        progress = 1
+
+        target = Path(target)
+        target.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha1(str(target.absolute()).encode()).hexdigest()
+        path = CONST.MANIFEST.joinpath('{0}.json'.format(digest))
+        manifest = utils.load(path)
+        delivered = Resolver()
+
+        jobs = []
         for key, src in self.files.items():
             try:
                 # Do not deliver excel file
                 if key == 'xlsx':
                     continue
 
-                dst = Path(target).joinpath(src.name)
-                utils.copy(src, dst)
-
-                wlogger("{0}", dst.name, progress)
+                stat = self.resolver.stat(src)
+                dst = delivered.get(target.joinpath(src.name))
+                if is_same(src, dst, stat) is True:
+                    wlogger("Unchanged {0}", src.name, 1)
+                    manifest[src.name] = [stat.st_size, stat.st_mtime_ns]
+                else:
+                    jobs.append((src, stat))
             except Exception as e:
                 logger.exception(e)
                 wlogger("Exception {0}", str(e))
 
-            progress += 1
+        # copy2 uses the fast copy of system and keeps mtime
+        with ThreadPoolExecutor(CONST.COPY_WORKERS) as executor:
+            futures = [(src, stat, executor.submit(
+                shutil.copy2, src, target.joinpath(src.name)))
+                for src, stat in jobs]
+
+            progress = 1
+            for src, stat, future in futures:
+                try:
+                    future.result()
+                    manifest[src.name] = [stat.st_size, stat.st_mtime_ns]
+                    wlogger("{0}", src.name, progress)
+                except Exception as e:
+                    logger.exception(e)
+                    wlogger("Exception {0}", str(e))
+
+                progress += 1
+
+        try:
+            utils.write(manifest, path)
+        except Exception as e:
+            logger.exception(e)
 
     def generate_spec(self, options, update_spec = False):
         '''Generate test spec'''
         logger.debug("Generate test spec")
+        excel = None
         try:
             # Copy template
             filename = '{func}.xlsx'.format(**self.info)
@@ -1518,12 +2213,18 @@ class Report(Base):
             if template is None or Path(template).is_file() is False:
                 template = CONST.SPEC
             wlogger("Generating test spec {0}", filename, 0)
-            if update_spec == False:
-                utils.copy(template, filespec)
+            engine = options.get('engine',
+                                 utils.load(CONST.SETTING, 'specEngine'))
 
-            # open file excel
+            # open file excel, openpyxl clones template in memory
             spec_sheets = utils.load(CONST.SETTING, 'specSheets')
-            excel = ExcelWin32(filespec)
+            if engine == 'openpyxl':
+                base = None if update_spec else template
+                excel = ExcelXlsx(filespec, base)
+            else:
+                if update_spec == False:
+                    utils.copy(template, filespec)
+                excel = ExcelWin32(filespec)
             vba_err = "Error VBA {0}"
             
             wlogger("Clear to update !",15)
@@ -1552,10 +2253,13 @@ class Report(Base):
                         cmd = 'Import_Coverage_File'
                     path = self.files.get(key)
                     paras = [filename, sheet, cell, str(path)]
+                    exists = self.resolver.is_file(path)
+                    if isinstance(excel, ExcelXlsx) and exists:
+                        paras[3:] = self.get_spec_source(key)
 
                     wlogger("Copying {0} to sheet {1}", [
                             path.name, sheet], progress)
-                    if path.is_file():
+                    if exists:
                         rst = excel.run(sheet, cmd, paras)
                         wlogger(vba_err, rst) if rst != 'vba_ok' else None
                     else:
@@ -1596,7 +2300,7 @@ class Report(Base):
                     wlogger("Table {0}: Updating", '1.5', 65)
                     filepath = self.files.get('stub')
                     paras = [filename, sheet, 'B53', str(filepath)]
-                    if filepath.is_file():
+                    if self.resolver.is_file(filepath):
                         rst = excel.run(sheet, cmd, paras)
                         wlogger(vba_err, rst) if rst != 'vba_ok' else None
                     else:
@@ -1615,7 +2319,7 @@ class Report(Base):
                 stub_data += self.csv.stub_info.get('non_stub')
                 data = []
                 for lst in stub_data:
-                    lst.reverse()
+                    lst = lst[::-1]
                     if lst[1] == '':
                         lst[1] = '-'
                     data.append(lst)
@@ -1653,7 +2357,7 @@ class Report(Base):
                 try:
                     wlogger("Table {0}: Updating", '1.2', 80)
 
-                    label_list = FileIE(self.files.get('ie')).lst_label
+                    label_list = self.init(FileIE, 'ie').lst_label
                     data_spec = self.get_spec_data(label_list)
 
                     for i in range(len(label_list)):
@@ -1700,18 +2404,36 @@ class Report(Base):
             wlogger("Exception {0}", str(e))
         finally:
             wlogger("Done !!! Please double check !!!", '', 100)
-            excel.close()
+            if excel is not None:
+                excel.close()
+
+    def get_spec_source(self, key):
+        '''Get parsed data of file to import to test spec,
+        the arguments after cell of import macro'''
+        if key == 'testlog':
+            return [self.init(FileTxt, key).get_lines()]
+
+        clsname = {
+            'table': FileTable,
+            'io': FileIO,
+            'oe': FileOE,
+            'ie': FileIE
+        }.get(key)
+        obj = self.init(clsname, key)
+        return [obj.get_table_raw(obj.table), obj.get_table_merges(obj.table)]
 
     def get_spec_data(self, label_list):
         '''Get data to fill table 1.2 test spec'''
         def get_var_tc_data(index, label):
             '''Get testcase of variable'''
-            lst_item = iotbl.get_var_ai(index)
+            if label not in label_ai:
+                label_ai[label] = set([item for item, info in data_ai.items()
+                                       if label in info.get('id')])
+
             lst_tc = []
-            for item in set(lst_item):
-                if label in data_ai.get(item).get('id'):       
-                    if data_tc.get(item) != None :
-                        lst_tc += data_tc.get(item) 
+            for item in var_ai.get(index, []):
+                if item in label_ai[label] and data_tc.get(item) != None:
+                    lst_tc += data_tc.get(item)
             return lst_tc
 
         def get_var_str(var, default=None):
@@ -1730,14 +2452,18 @@ class Report(Base):
         try:
             data = {}
 
-            iotbl = FileIO(self.files.get('io'))
-            ietbl = FileIE(self.files.get('ie'))
-            tctbl = FileTable(self.files.get('table'))
+            iotbl = self.init(FileIO, 'io')
+            ietbl = self.init(FileIE, 'ie')
+            tctbl = self.init(FileTable, 'table')
 
             data_tc = tctbl.get_testcase_data()
             data_ai = ietbl.get_analysis_item()
             data_var = iotbl.get_io_vars()
 
+            # Analysis items of each variable column and of each label
+            var_ai = iotbl.get_var_ai_index()
+            label_ai = {}
+
             # Get all label spec info
             data_label = {}
             comment_p3_temp = ''
@@ -1861,6 +2587,9 @@ class Report(Base):
             dct = self.checklist.get(file_type, {})
             lst = []
             for item, desc in list_item:
+                # Skip item which is not in check profile
+                if self.levels.get(item, 1) > self.level:
+                    continue
                 exp = tooltip.get(item, desc)
                 tmp = [desc] + dct.get(item, [None, '']) + [exp]
                 lst.append(tmp)
@@ -1876,14 +2605,15 @@ class Report(Base):
     def get_label_data(self):
         '''Get lable data'''
         logger.debug("Get label data")
-        tbl = FileTable(self.files.get('table'))
+        tbl = self.init(FileTable, 'table')
         data_tc = tbl.get_testcase_data()
 
-        tbl = FileIE(self.files.get('ie'))
+        tbl = self.init(FileIE, 'ie')
         data_ie = tbl.data_analysis
 
         data = {}
         for _, dct in data_ie.items():
+            dct = dict(dct)
             idstr = dct.get('id').replace(';', ',')
             lst = [l.strip() for l in idstr.split(',')
                    if l.strip() != '']
@@ -0,0 +1,639 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import fnmatch
+import logging
+import os
+import re
+import sys
+from collections import OrderedDict
+from pathlib import Path
+
+import lila.const as CONST
+from lila import parse, utils
+from lila.ams import FileTable
+
+logger = logging.getLogger(__name__)
+
+
+def text(value):
+    '''Text of excel cell as it is exported to csv'''
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).replace('_x000D_', '').replace('\r', '')
+
+
+def get_summary(xlsx, sheet, pics=None, phases=None):
+    '''Get functions from summary, header row is found by header mapping'''
+    logger.debug("Get summary %s %s", xlsx, sheet)
+    headers = utils.load(CONST.SETTING, 'headerXlsx')
+    data = parse.get_xlsx_raw(xlsx, sheet)
+
+    keys = None
+    result = []
+    for row in data:
+        row = [text(v) for v in row]
+        if keys is None:
+            lst = [headers.get(col) for col in row]
+            if 'func' in lst and 'src_rel' in lst:
+                keys = [headers.get(col, col) for col in row]
+            continue
+
+        # Table ends at empty row
+        if ''.join(row).strip() == '':
+            break
+
+        info = dict(zip(keys, row))
+        if (not info.get('func_no', '').isdigit() or
+                re.match(r'\w', info.get('src_rel', '')) is None or
+                row[0].startswith('LOCs per Group')):
+            continue
+
+        if pics and info.get('pic') not in pics:
+            continue
+
+        if phases and info.get('phase') not in phases:
+            continue
+
+        result.append(info)
+
+    return result
+
+
+class Collector(object):
+
+    columns = [
+        'PAT', 'STATUS_GROUP', 'STATUS_CSV', 'STATUS_DESCRIPTION_CSV',
+        'STATUS_HTML', 'STATUS_COV', 'STATUS_STUB', 'STATUS_SPEC',
+        'STATUS_DIR_SRC_SPEC', 'STATUS_SRC_NAME_SPEC', 'STATUS_FUNC_NAME_SPEC',
+        'STATUS_EXTENSION_NAME_SPEC', 'STATUS_BUG_REPORT',
+        'STATUS_COV_NAME_SPEC', 'STATUS_ATTRIBUTE', 'STATUS_INDEX_HOPING',
+        'STATUS_CONFIRMATION', 'STATUS_SPEC_COV_GENERATE_FULL'
+    ]
+
+    # Sheet index of unit test specification
+    sheets = {
+        'spec': 2,
+        'table': 6,
+        'testlog': 7
+    }
+
+    def __init__(self, result, sheet, source=None, pattern='*', full=False):
+        self.result = Path(result)
+        self.source = source
+        self.pattern = pattern
+        self.full = full
+
+        jp = utils.load(CONST.SETTING, 'jpDict')
+        self.dirresult = jp.get('dirresult')
+        self.dirspec = jp.get('dirspec')
+        self.bug_report = '{0}_{1}No'.format(sheet, jp.get('issue'))
+
+        self.files = {}
+        self.funcs = {}
+        self.sources = {}
+        self.index_result()
+        self.index_source()
+
+    def index_result(self):
+        '''Walk result directory once, keep files of each directory and
+        directories of each function'''
+        logger.debug("Index result %s", self.result)
+        for root, dirs, files in os.walk(self.result):
+            path = Path(root)
+            if path == self.result:
+                dirs[:] = fnmatch.filter(dirs, self.pattern)
+            self.files[path] = set(files)
+            if path.parent.name == self.dirresult:
+                self.funcs.setdefault(path.name, []).append(path)
+
+    def index_source(self):
+        '''Index source files of target by name'''
+        if self.source is None:
+            return
+
+        logger.debug("Index source %s", self.source)
+        lst, _ = utils.scan_files(self.source, ext='.c')
+        for path in lst:
+            posix = path.as_posix()
+            if '/target' in posix and '/mcdc/' not in posix:
+                self.sources.setdefault(path.name, []).append(posix)
+
+    def find_source(self, src_rel):
+        '''Find source file at target of input'''
+        lst = [path for path in self.sources.get(Path(src_rel).name, [])
+               if path.endswith('/{0}'.format(src_rel))]
+        return lst[0] if len(lst) > 0 else None
+
+    def collect(self, functions, ng_only=False):
+        '''Check functions, yield report lines'''
+        yield ','.join(self.columns)
+        for info in functions:
+            try:
+                status, ng = self.check(info)
+            except Exception as e:
+                logger.exception(e)
+                status, ng = self.get_error(info), True
+
+            if ng_only is False or ng is True:
+                yield ','.join(status.values())
+
+    def get_error(self, info):
+        '''Status of function which can not be checked'''
+        status = OrderedDict((col, 'ERROR') for col in self.columns)
+        status['PAT'] = info.get('func', '')
+        return status
+
+    def check(self, info):
+        '''Check result of function'''
+        func = Function(self, info)
+        lst = self.funcs.get(func.pat, [])
+
+        # Missing and duplicate directories are NG, script_collect_result.sh
+        # leaves them out of its NG only output
+        if len(lst) == 1:
+            func.run(lst[0])
+        elif len(lst) > 1:
+            func.status['STATUS_GROUP'] = 'DUPLICATE_FUNC'
+            func.ng = True
+        else:
+            func.status['STATUS_GROUP'] = 'NOT_FOUND_DIR'
+            func.ng = True
+
+        return func.status, func.ng
+
+
+class Function(object):
+
+    def __init__(self, collector, info):
+        self.collector = collector
+        self.full = collector.full
+
+        src_rel = info.get('src_rel', '')
+        self.src_rel = src_rel
+        self.src_dir = os.path.dirname(src_rel)
+        self.src_name = src_rel.split('/')[-1]
+        self.group = info.get('group', '')
+        self.pat = info.get('func', '')
+        self.no = info.get('func_no', '')
+        self.score = [info.get(k, '') for k in ['c0', 'c1', 'mcdc']]
+
+        self.status = OrderedDict(
+            (col, 'NOT_RUN') for col in collector.columns)
+        self.status['PAT'] = self.pat
+        self.ng = False
+
+        self.dir = None
+        self.spec = None
+        self.data = {}
+
+    def set(self, key, value, ng=False):
+        self.status['STATUS_{0}'.format(key)] = value
+        if ng is True:
+            self.ng = True
+
+    def get(self, key):
+        return self.status['STATUS_{0}'.format(key)]
+
+    def exists(self, name, directory=None):
+        directory = self.dir if directory is None else directory
+        return name in self.collector.files.get(directory, set())
+
+    def read(self, name):
+        path = self.dir.joinpath(name)
+        with open(path, encoding='shift-jis', errors='ignore') as fp:
+            return fp.read().splitlines()
+
+    def list_ext(self, ext):
+        return sorted(f for f in self.collector.files.get(self.dir, set())
+                      if f.endswith(ext))
+
+    def run(self, directory):
+        '''Run all checks of function in order'''
+        self.dir = directory
+
+        checks = [
+            self.check_group,
+            self.check_csv,
+            self.check_description_csv,
+            self.check_html,
+            self.check_cov,
+            self.check_stub,
+            self.check_spec,
+            self.check_spec_dir_src,
+            self.check_spec_src_name,
+            self.check_spec_func_name,
+            self.check_spec_csv_name,
+            self.check_spec_bug_report,
+            self.check_spec_cov,
+            self.check_attribute,
+            self.check_index_hoping,
+            self.check_confirmation,
+            self.check_spec_cov_full
+        ]
+        for check in checks:
+            try:
+                check()
+            except Exception as e:
+                logger.exception(e)
+                self.ng = True
+
+    def is_csv_ok(self):
+        return self.get('CSV') not in ['NG', 'NOT_RUN']
+
+    def check_group(self):
+        '''Group and source name in task directory'''
+        title = '_Group{0}_{1}_'.format(self.group, self.src_name)
+        if str(self.dir).count(title) > 0:
+            self.set('GROUP', 'OK')
+        else:
+            self.set('GROUP', 'NG', True)
+
+    def check_csv(self):
+        '''Csv and its data files'''
+        if not self.exists('{0}.csv'.format(self.pat)):
+            self.set('CSV', 'NG', True)
+            return
+
+        data = all(self.exists('{0}{1}'.format(self.pat, ext))
+                   for ext in ['.ini', '.xeat', '.xtct'])
+        if self.full is True:
+            if data and self.exists('TestReport.csv'):
+                name = '"{0}.csv"'.format(self.pat)
+                lst = [l for l in self.read('TestReport.csv')
+                       if l.startswith(name)]
+                self.set('CSV', 'OK' if len(lst) == 1 else
+                         'OK_WRONG_TestReport')
+            else:
+                self.set('CSV', 'OK_OTHER_NG', True)
+        else:
+            if data:
+                self.set('CSV', 'OK')
+            else:
+                self.set('CSV', 'OK_CSV_OTHER_NG', True)
+
+    def check_description_csv(self):
+        '''Test description in csv'''
+        if not self.is_csv_ok() or self.collector.source is None:
+            return
+
+        source = self.collector.find_source(self.src_rel)
+        if source is None:
+            self.set('DESCRIPTION_CSV', 'NG_NOT_FOUND_SOURCE', True)
+            return
+
+        def field(lines, index):
+            lst = [l.split(',')[index].replace('"', '').split('/')[-1]
+                   for l in lines if len(l.split(',')) > index]
+            return ' '.join(lst)
+
+        lines = [l for l in self.read('{0}.csv'.format(self.pat))
+                 if l.startswith('mod')]
+        desc1, desc2 = field(lines, 1), field(lines, 2)
+        end = 'Simulink model' if utils.is_simulink(source) else self.pat
+
+        check1 = int(desc1.endswith(self.pat))
+        check2 = int(desc2.endswith(end))
+        if check1 == 1 and check2 == 1:
+            self.set('DESCRIPTION_CSV', 'OK')
+        else:
+            self.set('DESCRIPTION_CSV', 'NG_{0}'.format(check2), True)
+
+    def check_html(self):
+        '''Html files'''
+        if len(self.list_ext('.html')) == 0:
+            self.set('HTML', 'NG', True)
+            return
+
+        lst = ['_IE.html', '_OE.html', '_IO.html', '_Table.html', '_TC.html']
+        data = all(self.exists('{0}{1}'.format(self.pat, ext)) for ext in lst)
+        if self.full is True:
+            data = data and self.exists('{0}_Info.html'.format(self.pat)) \
+                and self.exists('TestReport.htm')
+            if data:
+                name = '{0}.csv'.format(self.pat)
+                found = any(name in l for l in self.read('TestReport.htm'))
+                self.set('HTML', 'OK' if found else
+                         'OK_WRONG_{0}'.format(self.dir.joinpath(
+                             'TestReport.htm').as_posix()))
+            else:
+                self.set('HTML', 'OK_LACK_FILE', True)
+        else:
+            if data:
+                self.set('HTML', 'OK')
+            else:
+                self.set('HTML', 'OK_LACK_FILE', True)
+
+    def get_testlog(self, label):
+        '''Values of label in testlog txt'''
+        lst = []
+        for name in self.list_ext('.txt'):
+            lst += [l for l in self.read(name) if l.startswith(label)]
+        return lst
+
+    def check_cov(self):
+        '''Testlog'''
+        if not self.is_csv_ok():
+            return
+
+        if len(self.list_ext('.txt')) != 1:
+            self.set('COV', 'NG', True)
+            return
+
+        count = len([l for l in self.get_testlog('Function name')
+                     if re.search(r'\b{0}\b'.format(re.escape(self.pat)), l)])
+        if count == 1:
+            self.set('COV', 'OK')
+        else:
+            self.set('COV', 'OK_WRONG_NAME_{0}'.format(count), True)
+
+    def check_stub(self):
+        '''Stub source is delivered only if stub is used'''
+        if not self.is_csv_ok():
+            return
+
+        stub = any(l.startswith('%,"AMSTB_')
+                   for l in self.read('{0}.csv'.format(self.pat)))
+        exists = self.exists('AMSTB_SrcFile.c')
+
+        if stub:
+            self.set('STUB', 'STUB_OK' if exists else 'STUB_NG', not exists)
+        else:
+            self.set('STUB', 'NONSTUB_NG' if exists else 'NONSTUB_OK', exists)
+
+    def check_spec(self):
+        '''Unit test specification'''
+        directory = self.dir.parent.parent.joinpath(self.collector.dirspec)
+        name = '{0}.xlsx'.format(self.pat)
+        if self.exists(name, directory):
+            self.set('SPEC', 'OK')
+            self.spec = directory.joinpath(name)
+
+            sheets = self.collector.sheets
+            data = parse.get_xlsx_raws(self.spec, list(sheets.values()))
+            self.data = {key: [[text(v) for v in row]
+                               for row in data.get(index, [])]
+                         for key, index in sheets.items()}
+        else:
+            self.set('SPEC', 'NG', True)
+
+    def is_spec_ok(self):
+        return self.get('SPEC') == 'OK'
+
+    def get_spec(self, label):
+        '''Values next to label in spec sheet'''
+        return [row[5] for row in self.data['spec']
+                if label in row[1:] and len(row) > 5]
+
+    def check_spec_dir_src(self):
+        if self.is_spec_ok():
+            ok = ' '.join(self.get_spec('フォルダ')) == self.src_dir
+            self.set('DIR_SRC_SPEC', 'OK' if ok else 'NG', not ok)
+
+    def check_spec_src_name(self):
+        if self.is_spec_ok():
+            ok = self.get_spec('ファイル名').count(self.src_name) == 1
+            self.set('SRC_NAME_SPEC', 'OK' if ok else 'NG', not ok)
+
+    def check_spec_func_name(self):
+        if self.is_spec_ok():
+            value = ' '.join(self.get_spec('モジュール(関数)名'))
+            if value == self.pat:
+                self.set('FUNC_NAME_SPEC', 'OK')
+            else:
+                self.set('FUNC_NAME_SPEC', 'NG_{0}'.format(value), True)
+
+    def check_spec_csv_name(self):
+        if self.is_spec_ok():
+            name = '{0}.csv'.format(self.pat)
+            ok = self.get_spec('CSVファイル名').count(name) == 1
+            self.set('EXTENSION_NAME_SPEC', 'OK' if ok else 'NG', not ok)
+
+    def get_result(self, label, sep=':'):
+        '''Value of label in test result of spec'''
+        lst = []
+        for row in self.data['spec']:
+            for value in row:
+                if value.startswith('テスト結果') and '\n' in value:
+                    lst += [l.strip() for l in value.split('\n')]
+
+        values = [re.sub(r'\s', '', l.split(sep)[-1])
+                  for l in lst if l.startswith(label)]
+        return ' '.join(values)
+
+    def check_spec_bug_report(self):
+        '''Test result and issue of spec'''
+        if not self.is_spec_ok():
+            return
+
+        status = self.get_result('テスト結果')
+        issue = self.get_result('問題点', '：')
+        issue = re.sub(r'\s', '', issue.split(':')[-1])
+
+        # Missing label and wrong id are not NG, same as the script
+        noissue = utils.load(CONST.SETTING, 'jpDict.noissue')
+        if issue == '':
+            self.set('BUG_REPORT', 'NG_NOT_FIND_LABEL_BUG_REPORT_')
+        elif issue == noissue and status == 'OK':
+            self.set('BUG_REPORT', 'OK')
+        elif issue != noissue and status == 'NG':
+            if self.collector.bug_report in issue:
+                ids = sorted(set(i[2:] for i in re.findall(r'No\w*', issue)))
+                if ids == [self.no]:
+                    self.set('BUG_REPORT', 'OK')
+                else:
+                    self.set('BUG_REPORT',
+                             'NG_WRONG_ID_{0}'.format('_'.join(ids)))
+            else:
+                self.set('BUG_REPORT', 'NG_NAME_{0}'.format(issue), True)
+        else:
+            self.set('BUG_REPORT', 'NG_STATUS_{0}'.format(issue), True)
+
+    def get_cov(self, label):
+        '''Values of label in testlog sheet of spec and testlog txt'''
+        spec = [row[0] for row in self.data['testlog']
+                if len(row) > 0 and row[0].startswith(label)]
+        return spec, self.get_testlog(label)
+
+    def check_spec_cov(self):
+        '''Testlog sheet of spec vs testlog txt, test result and summary'''
+        def value(lines):
+            return ' '.join(re.sub(r'\s', '', l.split(':')[-1])
+                            for l in lines)
+
+        def test_time(lines):
+            label = 'Test time : '
+            lst = [re.sub(r'\s+', ' ', l).replace(',', '') for l in lines]
+            return ' '.join(l.replace(label, '') for l in lst)
+
+        def score(percent):
+            try:
+                percent = float(percent.replace('%', '').split()[-1])
+                return '{0:g}'.format(percent / 100)
+            except Exception:
+                return ''
+
+        def number(value):
+            try:
+                return '{0:g}'.format(float(value))
+            except Exception:
+                return value
+
+        if not self.is_spec_ok():
+            return
+
+        spec, _ = self.get_cov('Function name')
+        names = [l.split()[3].split('/')[-1] for l in spec
+                 if len(l.split()) > 3]
+
+        cov_spec, cov_txt = [], []
+        for label in ['C0', 'C1', 'MC/DC']:
+            lst_spec, lst_txt = self.get_cov('{0} Coverage rate'.format(label))
+            cov_spec.append(value(lst_spec))
+            cov_txt.append(value(lst_txt))
+
+        time_spec, time_txt = self.get_cov('Test time')
+        time_spec, time_txt = test_time(time_spec), test_time(time_txt)
+
+        result = [self.get_result(label)
+                  for label in ['Ｃ０網羅率', 'Ｃ１網羅率', 'ＭＣ／ＤＣ網羅率']]
+
+        if names.count(self.pat) != 1:
+            self.set('COV_NAME_SPEC', 'NG', True)
+        elif time_txt != time_spec:
+            self.set('COV_NAME_SPEC', 'TIME_NG_COV_SPEC_N_TXT_{0}'.format(
+                time_spec.replace(' ', '_')), True)
+        elif cov_spec != cov_txt:
+            self.set('COV_NAME_SPEC', 'PERCENT_NG_COV_SPEC_N_TXT_{0}'.format(
+                '_'.join(cov_spec)), True)
+        elif result != cov_txt:
+            self.set('COV_NAME_SPEC', 'PERCENT_NG_RESULT_SPEC_N_TXT_{0}'
+                     .format('_'.join(result)))
+        elif [number(s) for s in self.score] != [score(c) for c in cov_txt]:
+            self.set('COV_NAME_SPEC', 'PERCENT_NG_SUMMARY_N_TXT_{0}'.format(
+                '_'.join(self.score)))
+        else:
+            self.set('COV_NAME_SPEC', 'OK')
+
+    def get_table(self):
+        path = self.dir.joinpath('{0}_Table.html'.format(self.pat))
+        return FileTable(path) if path.is_file() else None
+
+    def check_attribute(self):
+        '''Attribute column in testcase table of spec and html'''
+        if not (self.is_spec_ok() and self.get('HTML') == 'OK'):
+            return
+
+        count_xlsx = len([row for row in self.data['table']
+                          if len(row) > 0 and row[0].startswith('No') and
+                          'Attribute' in row[1:]])
+        name = '{0}_Table.html'.format(self.pat)
+        count_html = len([l for l in self.read(name) if 'Attribute' in l])
+
+        ok = count_xlsx == 1 and count_html == 1
+        self.set('ATTRIBUTE', 'OK' if ok else 'NG')
+
+    def get_tc_rows(self):
+        '''Testcase rows in testcase table of spec'''
+        return [row for row in self.data['table']
+                if len(row) > 0 and re.match(r'-[0-9]+', row[0])]
+
+    def check_index_hoping(self):
+        '''Testcase numbers of spec and html are continuous'''
+        if not self.is_spec_ok():
+            return
+
+        table = self.get_table()
+        lst_xlsx = [re.match(r'-([0-9]+)', row[0]).group(1)
+                    for row in self.get_tc_rows()]
+        lst_html = [] if table is None else \
+            [str(n) for n in table.get_column('no') if n != -1]
+
+        end = int(lst_xlsx[-1]) if len(lst_xlsx) > 0 else 0
+        lst = [str(i) for i in range(1, end + 1)]
+
+        ok = lst_xlsx == lst_html == lst
+        self.set('INDEX_HOPING', 'OK' if ok else 'NG', not ok)
+
+    def check_confirmation(self):
+        '''Confirmation of spec and html'''
+        if not (self.is_spec_ok() and self.get('HTML') == 'OK'):
+            return
+
+        lst_xlsx = []
+        for row in self.get_tc_rows():
+            values = row[:]
+            while len(values) > 1 and values[-1] == '' and \
+                    re.search(r'(OK|Fault)$', ''.join(values)):
+                values.pop()
+            lst_xlsx.append(values[-1])
+
+        table = self.get_table()
+        number = table.get_column('no')
+        confirm = table.get_column('confirm')
+
+        base = 0
+        html = 0
+        lst_html = []
+        for r in range(len(table.table)):
+            if table.table.get_class(r, table.ino) in FileTable.class_no[:2]:
+                base += 1
+            if table.table.get_class(r, table.icf) in \
+                    ['data-confir', 'data-confir-last'] and \
+                    re.match('OK|Fault', confirm[r]):
+                html += 1
+            if number[r] != -1:
+                lst_html.append(confirm[r].strip())
+
+        xlsx = len([v for v in lst_xlsx if re.match('OK|Fault', v)])
+        ok = base == xlsx == html and lst_xlsx == lst_html
+        self.set('CONFIRMATION', 'OK' if ok else 'NG', not ok)
+
+    def check_spec_cov_full(self):
+        '''Testlog sheet of spec has source code of function'''
+        if not self.is_spec_ok():
+            return
+
+        pattern = r'{0}\s*\('.format(re.escape(self.pat))
+        ok = any(re.search(pattern, row[0]) for row in self.data['testlog']
+                 if len(row) > 0 and not row[0].startswith('Function name'))
+        self.set('SPEC_COV_GENERATE_FULL', 'OK' if ok else 'NG')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m lila.collect',
+        description='Collect check result of delivered functions')
+    parser.add_argument('summary', help='summary xlsx')
+    parser.add_argument('sheet', help='sheet of summary')
+    parser.add_argument('result', help='directory of delivered results')
+    parser.add_argument('-s', '--source', help='directory of input source')
+    parser.add_argument('-p', '--pattern', default='*',
+                        help='task directories to check, e.g. Task*Group1*')
+    parser.add_argument('--pic', nargs='*', help='only functions of PIC')
+    parser.add_argument('--phase', nargs='*', help='only release phases')
+    parser.add_argument('--full', action='store_true',
+                        help='also check TestReport and _Info.html')
+    parser.add_argument('--ng', action='store_true',
+                        help='only print NG functions')
+    parser.add_argument('-o', '--output', help='write report to file')
+    args = parser.parse_args(argv)
+
+    functions = get_summary(args.summary, args.sheet, args.pic, args.phase)
+    collector = Collector(args.result, args.sheet, args.source,
+                          args.pattern, args.full)
+
+    lines = []
+    for line in collector.collect(functions, args.ng):
+        print(line)
+        lines.append(line)
+
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as fp:
+            fp.write('\n'.join(lines) + '\n')
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
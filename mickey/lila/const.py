@@ -8,10 +8,27 @@ CODE = 'Mickey'
 
 PORT = 9892
 
+# Number of parsed files kept in memory
+CACHE_SIZE = 32
+
 HOME = Path.home().joinpath(NAME)
 CONFIG = HOME.joinpath('config.json')
 LOGS = HOME.joinpath('logs', 'messages')
 
+# Parsed html files, format version of cache files
+CACHE = HOME.joinpath('cache')
+CACHE_VERSION = 2
+
+# Size of html which is streamed instead of parsed as whole document
+STREAM_SIZE = 16*1024*1024
+
+# Functions delivered at the same time in batch deliver
+DELIVER_WORKERS = 4
+
+# Delivered files of each target directory, files copied at the same time
+MANIFEST = HOME.joinpath('deliver')
+COPY_WORKERS = 4
+
 DATA = HOME.joinpath('db')
 WORKSPACE = DATA.joinpath('workspace.json')
 PACKAGE = DATA.joinpath('package.json')
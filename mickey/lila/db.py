@@ -4,8 +4,6 @@ import logging
 import time
 from pathlib import Path
 
-from jira import JIRA
-
 import lila.const as CONST
 from lila import parse, utils
 
@@ -78,6 +76,8 @@ class Package(object):
 
     def update_data_jira(self):
         '''Update jira data of package'''
+        from jira import JIRA
+
         try:
             logger.debug("Update jira data of package %s", self.name)
             ticket = self.info.get('jira')
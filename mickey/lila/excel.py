@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import logging
+import pickle
+import threading
+from copy import copy
 from pathlib import Path
 
-import win32com.client
+from openpyxl import load_workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import PatternFill
 
 import lila.const as CONST
 
@@ -13,6 +18,8 @@ logger = logging.getLogger(__name__)
 class ExcelWin32(object):
 
     def __init__(self, xlsx):
+        import win32com.client
+
         self.name = Path(xlsx).name
         self.excel = win32com.client.Dispatch('Excel.Application')
         # self.excel.Visible = False
@@ -42,3 +49,439 @@ class ExcelWin32(object):
             self.wb.Close()
         except Exception as e:
             logger.exception(e)
+
+
+class Template(object):
+    '''Spec templates parsed once per process.
+    Workbook is kept pickled, unpickling is a cheap deep copy for each spec'''
+
+    def __init__(self):
+        self.data = {}
+        self.lock = threading.Lock()
+
+    def load(self, path):
+        '''Get new workbook of template'''
+        path = Path(path)
+        stat = path.stat()
+        key = str(path.absolute())
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            item = self.data.get(key)
+            if item is None or item[0] != stamp:
+                logger.debug("Parse template %s", path.name)
+                item = (stamp, pickle.dumps(load_workbook(path)))
+                self.data[key] = item
+
+        return self.bind(pickle.loads(item[1]))
+
+    def bind(self, wb):
+        '''Bind row and column dimensions to their sheet again.
+        Pickle keeps default factory of dimensions as their worksheet'''
+        for ws in wb.worksheets:
+            for dims, factory in [(ws.row_dimensions, ws._add_row),
+                                  (ws.column_dimensions, ws._add_column)]:
+                dims.worksheet = ws
+                dims.default_factory = factory
+        return wb
+
+
+# Parsed spec templates shared by all reports in app session
+template = Template()
+
+
+class ExcelXlsx(object):
+    '''Run the macros of vba.xlsm with openpyxl.
+    Html and coverage sources are the parsed data instead of file paths,
+    the workbook is saved once on close'''
+
+    macros = {
+        'Clear_Sheet_html': 'clear_sheet_html',
+        'Clear_SHEET_NAME_RESULT_Table_1_4': 'clear_table_1_4',
+        'Clear_SHEET_NAME_RESULT_Table_1_3': 'clear_table_1_3',
+        'Import_HTML_File': 'import_html',
+        'Import_Coverage_File': 'import_coverage',
+        'Import_StubFile': 'import_stub',
+        'Fmt_correction': 'fmt_correction',
+        'Remove_Row_Description': 'remove_row_description',
+        'Fill_Table_1_4': 'fill_table_1_4',
+        'Fill_Table_1_3': 'fill_table_1_3',
+        'Fill_Table_1_2': 'fill_table_1_2',
+        'Fill_cell': 'fill_cell',
+        'Fill_fault_conditional_format_n_reset_pointer': 'reset_pointer',
+    }
+
+    # Cells of sheet tool in vba.xlsm, same names as the macro constants
+    labels = {
+        'RANGE_TB_1_2': 'A1',
+        'SHEET_NAME_COV': 'A2',
+        'SHEET_NAME_RESULT': 'A4',
+        'SHEET_NAME_IE': 'A5',
+        'SHEET_NAME_OE': 'A6',
+        'SHEET_NAME_IO': 'A7',
+        'SHEET_NAME_TABLE': 'A8',
+        'CONST_TABLE_1_3': 'A10',
+        'CONST_TABLE_1_4': 'A11',
+        'CONST_STUB_TABLE_1_4': 'A12',
+        'CONST_NONSTUB_TABLE_1_4': 'A13',
+        'CONST_FILE_STUB_1_5': 'A14',
+        'CONST_STUB': 'A16',
+        'CONST_COV': 'A17',
+    }
+
+    tool = None
+    lock = threading.Lock()
+    fault = PatternFill(bgColor='FF99CC')
+
+    def __init__(self, xlsx, base=None):
+        '''Open xlsx, or new workbook from template base saved as xlsx'''
+        self.name = Path(xlsx).name
+        self.path = xlsx
+        if base is None:
+            self.wb = load_workbook(xlsx)
+        else:
+            self.wb = template.load(base)
+
+        with self.lock:
+            if ExcelXlsx.tool is None:
+                wb = load_workbook(CONST.VBA, read_only=True)
+                ws = wb['tool']
+                ExcelXlsx.tool = {k: ws[v].value or ''
+                                  for k, v in self.labels.items()}
+                wb.close()
+
+    def run(self, sheet, cmd, params):
+        '''Execute macro command'''
+        logger.debug("Execute macro %s %s", cmd, sheet)
+        try:
+            rst = getattr(self, self.macros[cmd])(*tuple(params))
+        except Exception as e:
+            logger.exception(e)
+            rst = "Exception {0}".format(str(e))
+        finally:
+            logger.debug("Run status %s", rst)
+            return rst
+
+    def close(self):
+        '''Save and close workbook'''
+        logger.debug("Close excel file %s", self.name)
+        try:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self.wb.save(self.path)
+            self.wb.close()
+        except Exception as e:
+            logger.exception(e)
+
+    def get_sheet(self, name):
+        '''Get first sheet which title contains name'''
+        for ws in self.wb.worksheets:
+            if name in ws.title:
+                return ws
+
+        raise KeyError(name)
+
+    def find(self, ws, text):
+        '''Find first cell by rows which value is text'''
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value == text:
+                    return cell
+
+        raise KeyError(text)
+
+    def merge_rows(self, ws, row, cols):
+        '''Merge cells of column range cols from row to last row'''
+        (c1, c2), (r1, r2) = cols, row
+        for mcr in list(ws.merged_cells.ranges):
+            if mcr.min_row >= r1 and mcr.max_row <= r2 and \
+                    mcr.min_col >= c1 and mcr.max_col <= c2:
+                ws.unmerge_cells(mcr.coord)
+
+        if (r1, c1) != (r2, c2):
+            ws.merge_cells(start_row=r1, start_column=c1,
+                           end_row=r2, end_column=c2)
+
+    def insert_rows(self, ws, idx, amount=1):
+        '''Insert rows like Excel, the rows take format of row above.
+        openpyxl moves cells only, merged ranges and heights are moved here'''
+        ws.insert_rows(idx, amount)
+
+        for mcr in ws.merged_cells.ranges:
+            if mcr.min_row >= idx:
+                mcr.shift(0, amount)
+            elif mcr.max_row >= idx:
+                mcr.expand(down=amount)
+        # Ranges are hashed by bounds
+        ws.merged_cells.ranges = set(ws.merged_cells.ranges)
+
+        heights = {r: d.height for r, d in ws.row_dimensions.items()
+                   if r >= idx and d.height is not None}
+        for r in heights:
+            ws.row_dimensions[r].height = None
+        for r, height in heights.items():
+            ws.row_dimensions[r + amount].height = height
+
+        # Format and horizontal merges of row above
+        src = idx - 1
+        for row in range(idx, idx + amount):
+            for cell in ws[src]:
+                if cell.has_style:
+                    ws.cell(row, cell.column)._style = copy(cell._style)
+            ws.row_dimensions[row].height = ws.row_dimensions[src].height
+            for mcr in list(ws.merged_cells.ranges):
+                if mcr.min_row == mcr.max_row == src:
+                    ws.merge_cells(start_row=row, start_column=mcr.min_col,
+                                   end_row=row, end_column=mcr.max_col)
+
+    def delete_rows(self, ws, idx, amount=1):
+        '''Delete rows like Excel, merged ranges and heights are moved'''
+        end = idx + amount - 1
+        for mcr in list(ws.merged_cells.ranges):
+            if mcr.min_row >= idx and mcr.max_row <= end:
+                ws.unmerge_cells(mcr.coord)
+
+        ws.delete_rows(idx, amount)
+
+        for mcr in ws.merged_cells.ranges:
+            if mcr.min_row > end:
+                mcr.shift(0, -amount)
+            elif mcr.max_row >= idx:
+                mcr.shrink(bottom=min(amount, mcr.max_row - idx + 1))
+        ws.merged_cells.ranges = set(ws.merged_cells.ranges)
+
+        heights = {r: d.height for r, d in ws.row_dimensions.items()
+                   if r > end and d.height is not None}
+        for r in heights:
+            ws.row_dimensions[r].height = None
+        for r, height in heights.items():
+            ws.row_dimensions[r - amount].height = height
+
+    def clear_sheet_html(self, wb_name):
+        '''Clear html sheets and coverage result to update'''
+        tool = self.tool
+        html = [tool['SHEET_NAME_IE'], tool['SHEET_NAME_OE'],
+                tool['SHEET_NAME_IO'], tool['SHEET_NAME_TABLE']]
+
+        for ws in self.wb.worksheets:
+            if any([name in ws.title for name in html]):
+                for mcr in list(ws.merged_cells.ranges):
+                    ws.unmerge_cells(mcr.coord)
+                ws.conditional_formatting = type(ws.conditional_formatting)()
+                ws.delete_rows(1, ws.max_row)
+
+            elif tool['SHEET_NAME_COV'] in ws.title:
+                row = self.find(ws, tool['CONST_COV']).row + 3
+                for r in range(row, ws.max_row + 1):
+                    ws.cell(r, 1).value = None
+
+        return 'vba_ok'
+
+    def clear_table_1_4(self, wb_name):
+        '''Restore table 1.4 to one empty row'''
+        tool = self.tool
+        ws = self.get_sheet(tool['SHEET_NAME_RESULT'])
+
+        stub = self.find(ws, tool['CONST_STUB_TABLE_1_4'])
+        row_stub, col_stub = stub.row + 2, stub.column - 1
+        nonstub = self.find(ws, tool['CONST_NONSTUB_TABLE_1_4'])
+        if row_stub < nonstub.row:
+            self.delete_rows(ws, row_stub, nonstub.row - row_stub)
+
+        nonstub = self.find(ws, tool['CONST_NONSTUB_TABLE_1_4'])
+        row_nonstub, col_nonstub = nonstub.row, nonstub.column + 2
+        row_file = self.find(ws, tool['CONST_FILE_STUB_1_5']).row - 2
+        if row_nonstub < row_file:
+            self.delete_rows(ws, row_nonstub + 1, row_file - row_nonstub)
+
+        ws.cell(row_nonstub - 1, col_stub).value = '1'
+        ws.cell(row_nonstub - 1, col_stub + 1).value = '-'
+        ws.cell(row_nonstub - 1, col_stub + 5).value = '-'
+        ws.cell(row_nonstub - 1, col_stub + 7).value = ''
+        ws.cell(row_nonstub, col_nonstub).value = ''
+        ws.cell(row_nonstub + 1, col_nonstub).value = ''
+
+        return 'vba_ok'
+
+    def clear_table_1_3(self, wb_name):
+        '''Restore table 1.3 to one empty row'''
+        tool = self.tool
+        ws = self.get_sheet(tool['SHEET_NAME_RESULT'])
+
+        table = self.find(ws, tool['CONST_TABLE_1_3'])
+        row, col = table.row + 3, table.column
+        end = self.find(ws, tool['CONST_TABLE_1_4']).row - 2
+        if row < end:
+            self.delete_rows(ws, row, end - row)
+
+        ws.cell(row - 1, col).value = '-'
+        ws.cell(row - 1, col + 5).value = '-'
+
+        return 'vba_ok'
+
+    def import_html(self, wb_name, sheet, cell, data, merges=()):
+        '''Write table raw data of html to sheet and merge the cells of
+        rowspan, colspan and br lines like Excel pastes the html'''
+        ws = self.get_sheet(sheet)
+        origin = ws[cell]
+        for r, row in enumerate(data):
+            for c, value in enumerate(row):
+                if value is not None and value != '':
+                    ws.cell(origin.row + r, origin.column + c).value = value
+
+        for r1, c1, r2, c2 in merges:
+            ws.merge_cells(start_row=origin.row + r1,
+                           start_column=origin.column + c1,
+                           end_row=origin.row + r2,
+                           end_column=origin.column + c2)
+
+        return 'vba_ok'
+
+    def import_coverage(self, wb_name, sheet, cell, lines):
+        '''Write coverage lines to sheet'''
+        ws = self.get_sheet(sheet)
+        origin = ws[cell]
+        for r, line in enumerate(lines):
+            ws.cell(origin.row + r, origin.column).value = line
+
+        return 'vba_ok'
+
+    def import_stub(self, wb_name, sheet, cell, path):
+        '''Write stub file name under label, openpyxl can not embed file'''
+        ws = self.get_sheet(sheet)
+        origin = self.find(ws, self.tool['CONST_STUB'])
+        ws.cell(origin.row + 1, origin.column).value = Path(path).name
+
+        logger.warning("Stub file is not embedded %s", Path(path).name)
+        return 'vba_ok'
+
+    def fmt_correction(self, wb_name, sheet, summary):
+        '''Highlight Fault result of testcase table.
+        Line correction and merge of macro go by fill colors of pasted html
+        which are not imported, so only the Fault highlight is done'''
+        if summary == 'IE':
+            logger.warning("Format correction is not supported %s", sheet)
+
+        elif summary == 'TC':
+            ws = self.get_sheet(sheet)
+            rows = [c.row for c in ws['A'] if c.value is not None]
+            cols = [c.column for c in ws[4] if c.value is not None]
+
+            # Testcases start at row 5 under header row 4
+            if rows == [] or cols == [] or max(rows) < 5:
+                return 'vba_ok'
+
+            last_row, last_col = max(rows), max(cols)
+            ref = '{0}{1}:{2}{3}'.format(
+                ws.cell(5, last_col).column_letter, 5,
+                ws.cell(last_row, last_col + 3).column_letter, last_row)
+            rule = CellIsRule(operator='equal', formula=['"Fault"'],
+                              fill=self.fault)
+            ws.conditional_formatting.add(ref, rule)
+
+        return 'vba_ok'
+
+    def remove_row_description(self, wb_name, sheet):
+        '''Clear values on the right of Description'''
+        ws = self.get_sheet(sheet)
+        for row in range(1, 31):
+            value = ws.cell(row, 1).value
+            if isinstance(value, str) and 'Description' in value:
+                col = 1
+                for mcr in ws.merged_cells.ranges:
+                    if mcr.min_row == row and mcr.min_col == 1:
+                        row, col = mcr.max_row, mcr.max_col
+
+                for c in range(col + 1, ws.max_column + 1):
+                    cell = ws.cell(row, c)
+                    if cell.value is not None:
+                        cell.value = ''
+                break
+
+        return 'vba_ok'
+
+    def get_fields(self, item, count=2):
+        '''Get first fields of data row like cells of 2D array in macro,
+        missing fields are empty'''
+        item = list(item)[:count]
+        return item + [''] * (count - len(item))
+
+    def fill_table_1_4(self, wb_name, sheet, cell, data):
+        '''Fill stub functions'''
+        ws = self.get_sheet(sheet)
+        label = self.find(ws, self.tool['CONST_STUB_TABLE_1_4'])
+        row, col = label.row + 1, label.column - 1
+
+        for k, item in enumerate(data):
+            name, stub = self.get_fields(item)
+            if k > 0:
+                self.insert_rows(ws, row + k)
+            ws.cell(row + k, col).value = k + 1
+            ws.cell(row + k, col + 1).value = name
+            ws.cell(row + k, col + 5).value = stub
+
+        return 'vba_ok'
+
+    def fill_table_1_3(self, wb_name, sheet, cell, data):
+        '''Fill initial values'''
+        ws = self.get_sheet(sheet)
+        label = self.find(ws, self.tool['CONST_TABLE_1_3'])
+        row, col = label.row + 2, label.column
+
+        for k, item in enumerate(data):
+            name, value = self.get_fields(item)
+            if k > 0:
+                self.insert_rows(ws, row + k)
+            ws.cell(row + k, col).value = name
+            ws.cell(row + k, col + 5).value = value
+
+        return 'vba_ok'
+
+    def fill_table_1_2(self, wb_name, sheet, cell, point, data):
+        '''Fill variables and testcases of test point'''
+        ws = self.get_sheet(sheet)
+        origin = ws[cell or 'B17']
+        col = origin.column
+
+        for row in range(origin.row + 2, origin.row + 1002):
+            if str(point) not in str(ws.cell(row, col).value):
+                continue
+
+            ws.cell(row, col + 5).value = self.tool['RANGE_TB_1_2']
+            for k, item in enumerate(data):
+                var, tc = self.get_fields(item)
+                if k > 0:
+                    self.insert_rows(ws, row + k)
+                target = ws.cell(row + k, col + 6)
+                target.value = var
+                alignment = copy(target.alignment)
+                alignment.horizontal = 'left'
+                target.alignment = alignment
+                ws.cell(row + k, col + 7).value = tc
+                ws.cell(row + k, col + 8).value = '-'
+
+            # Test item columns are merged vertically over the variables
+            end = row + len(data) - 1
+            for cols in [(col, col), (col + 1, col + 4), (col + 5, col + 5)]:
+                self.merge_rows(ws, (row, end), cols)
+            break
+
+        return 'vba_ok'
+
+    def fill_cell(self, wb_name, sheet, cell, value):
+        '''Fill value to cell'''
+        self.wb[sheet][cell].value = value
+        return 'vba_ok'
+
+    def reset_pointer(self, wb_name):
+        '''Reset zoom and selection of all sheets, activate first sheet'''
+        for ws in self.wb.worksheets:
+            view = ws.sheet_view
+            view.zoomScale = 100
+            view.topLeftCell = 'A1'
+            view.selection[0].activeCell = 'A1'
+            view.selection[0].sqref = 'A1'
+            view.tabSelected = False
+
+        self.wb.active = 0
+        self.wb.worksheets[0].sheet_view.tabSelected = True
+        return 'vba_ok'
@@ -3,20 +3,22 @@
 import io
 import logging
 import sys
+from itertools import islice
 from pathlib import Path
 
-from openpyxl import load_workbook
-
 logger = logging.getLogger(__name__)
 
 
-def parse_testlog(file):
-    '''Parse testlog file'''
+def parse_testlog(file, text=None):
+    '''Parse testlog file, or its text which is already loaded'''
     try:
         logger.debug("Parse testlog %s", Path(file).name)
         lst = ['func_full', 'src_full', 'c0', 'c1', 'mcdc', 'test_time']
-        with open(file, encoding='shift-jis', errors='ignore') as fp:
-            lines = [l.strip() for l in fp.readlines()[:len(lst)]]
+        if text is None:
+            with open(file, encoding='shift-jis', errors='ignore') as fp:
+                text = ''.join(islice(fp, len(lst)))
+
+        lines = [l.strip() for l in text.split('\n', len(lst))[:len(lst)]]
 
         data = {lst[i]: lines[i][lines[i].index(':')+1:].strip()
                 for i in range(len(lst))}
@@ -38,11 +40,14 @@ def parse_testlog(file):
 
 def get_xlsx_raw(xlsx, sheet, begin=1, end=sys.maxsize, headers={}):
     '''Get raw data of table from excel.'''
+    from openpyxl import load_workbook
+
     def val(cell):
         return str(cell.value) if cell.is_date else cell.value
 
     logger.debug("Get raw data from %s %s", Path(xlsx).name, sheet)
 
+    wb = None
     try:
         with open(xlsx, 'rb') as fp:
             xlsx = io.BytesIO(fp.read())
@@ -63,17 +68,51 @@ def get_xlsx_raw(xlsx, sheet, begin=1, end=sys.maxsize, headers={}):
         logger.exception(e)
         data = []
     finally:
-        wb.close()
+        if wb is not None:
+            wb.close()
+        return data
+
+
+def get_xlsx_raws(xlsx, sheets):
+    '''Get raw data of multiple sheets from excel, file is loaded once'''
+    from openpyxl import load_workbook
+
+    def val(cell):
+        return str(cell.value) if cell.is_date else cell.value
+
+    logger.debug("Get raw data from %s %s", Path(xlsx).name, sheets)
+
+    wb = None
+    try:
+        with open(xlsx, 'rb') as fp:
+            xlsx = io.BytesIO(fp.read())
+
+        wb = load_workbook(xlsx, read_only=True)
+        data = {}
+        for sheet in sheets:
+            name = sheet if isinstance(sheet, str) else wb.sheetnames[sheet-1]
+            data[sheet] = [[val(cell) for cell in row]
+                           for row in wb[name].rows]
+
+    except Exception as e:
+        logger.exception(e)
+        data = {}
+    finally:
+        if wb is not None:
+            wb.close()
         return data
 
 
 def get_xlsx_cells(xlsx, sheet, list_cell):
     '''Get cell value from excel file'''
+    from openpyxl import load_workbook
+
     def val(cell):
         return str(cell.value) if cell.is_date else cell.value
 
     logger.debug("Get value of cell %s", list_cell)
 
+    wb = None
     try:
         with open(xlsx, 'rb') as fp:
             xlsx = io.BytesIO(fp.read())
@@ -87,13 +126,17 @@ def get_xlsx_cells(xlsx, sheet, list_cell):
         logger.exception(e)
         data = {}
     finally:
-        wb.close()
+        if wb is not None:
+            wb.close()
         return data
 
 
 def get_xlsx_sheets(xlsx):
     '''Get sheets of xlsx'''
+    from openpyxl import load_workbook
+
     logger.debug("Get sheets from file %s", xlsx)
+    wb = None
     try:
         with open(xlsx, 'rb') as fp:
             xlsx = io.BytesIO(fp.read())
@@ -104,5 +147,6 @@ def get_xlsx_sheets(xlsx):
         logger.exception(e)
         data = []
     finally:
-        wb.close()
+        if wb is not None:
+            wb.close()
         return data
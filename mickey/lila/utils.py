@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
 import logging
 import os
@@ -7,14 +8,13 @@ import shutil
 import signal
 import socket
 import sys
+import threading
+import unicodedata
 import uuid
 from datetime import datetime
 from pathlib import Path
 
 import eel
-import requests
-import win32com.client
-from cryptography.fernet import Fernet
 
 import lila.const as CONST
 
@@ -55,11 +55,20 @@ def read_file(path):
         return fp.readlines()
 
 
+def normalize(text, form='NFKD'):
+    '''Normalize unicode text, ascii text is already normalized'''
+    return text if text.isascii() else unicodedata.normalize(form, text)
+
+
+def get_lang_path():
+    '''Get language file of current language'''
+    lang = load(CONST.CONFIG).get('language', 'en')
+    return CONST.ASSET.joinpath('lang_{0}.json'.format(lang))
+
+
 def get_lang_data(key=None):
     '''Get language data'''
-    lang = load(CONST.CONFIG).get('language', 'en')
-    path = CONST.ASSET.joinpath('lang_{0}.json'.format(lang))
-    data = load(path)
+    data = load(get_lang_path())
     return data if key is None else data.get(key, {})
 
 
@@ -105,6 +114,8 @@ def fuzzy_find(data, func, src_rel):
 
 def get_auth_key():
     '''Get auth key'''
+    from cryptography.fernet import Fernet
+
     return Fernet(CONST.KEY + str(uuid.getnode()))
 
 
@@ -149,6 +160,8 @@ def copy(src, dst):
 
 def download(url, target, auth):
     '''Download file'''
+    import requests
+
     try:
         logger.debug("Download %s", Path(url).name)
         r = requests.get(url, auth=auth, verify=False)
@@ -162,6 +175,8 @@ def download(url, target, auth):
 
 def update_file(path, target, date):
     '''Download/copy the latest file'''
+    import requests
+
     try:
         auth = get_auth_info()
         if path.startswith('http'):
@@ -185,6 +200,26 @@ def update_file(path, target, date):
         return target, date
 
 
+def hash_file(path, size=1048576):
+    '''Get sha1 hash of file content'''
+    sha = hashlib.sha1()
+    with open(path, 'rb') as fp:
+        for block in iter(lambda: fp.read(size), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def clean_cache(days=30):
+    '''Delete cache files which are not used for days'''
+    try:
+        limit = datetime.now().timestamp() - days*24*60*60
+        for path in CONST.CACHE.glob('*'):
+            if path.stat().st_mtime < limit:
+                path.unlink()
+    except Exception as e:
+        logger.exception(e)
+
+
 def delete(filepath):
     '''Delete file if exist'''
     if Path(filepath).is_file():
@@ -225,6 +260,30 @@ def collapse_list(lst):
     return ', '.join(rst)
 
 
+def is_same_var(var1, var2):
+    '''Compare variable var1 with var2.
+    @argument matches end of var2, $pointer matches pointer of var2'''
+    while var1 != var2:
+        # Argument
+        if var1.startswith('@') and var2.endswith(var1):
+            break
+
+        # Pointer
+        if var1.startswith('$') and var2.startswith('$'):
+            var1, var2 = var1[1:], var2[2:]
+            continue
+
+        return False
+
+    return True
+
+
+def diff_list(lst1, lst2):
+    '''Get items which are not in both lists, in order of lst1 + lst2'''
+    set1, set2 = set(lst1), set(lst2)
+    return [i for i in lst1 + lst2 if i not in set1 or i not in set2]
+
+
 def is_simulink(path):
     '''Check source code is Simulink model'''
     try:
@@ -340,6 +399,8 @@ def get_http_link(subpath):
 
 def get_http_date(url, auth):
     '''Get date of link'''
+    import requests
+
     try:
         r = requests.head(url, auth=auth, verify=False)
         return r.headers.get('last-modified')
@@ -390,6 +451,8 @@ def online_status(url=None):
     401 Unauthorize
     404 File not found
     '''
+    import requests
+
     try:
         auth = get_auth_info()
         url = get_http_link('package.json') if url is None else url
@@ -441,8 +504,15 @@ def upgrade_build(version):
         return status
 
 
+# Progress of reports in batch workers is not sent to web one by one
+progress = threading.local()
+
+
 def update_progress(msg, params=None, percent=0):
     '''Update report progress to web'''
+    if getattr(progress, 'muted', False):
+        return
+
     params = tuple(params) if isinstance(params, list) else tuple([params])
     msg = msg.format(*params)
     if msg.startswith('Error') or msg.startswith('Exception'):
@@ -2,16 +2,14 @@
 
 import logging
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from tkinter import Tk
-from tkinter.filedialog import askdirectory, askopenfilename
-
 import eel
-from jinja2 import Environment, FileSystemLoader, Template
 
 import lila.const as CONST
-from lila import db, parse, utils
-from lila.ams import Report
+from lila import db, utils
+from lila.utils import update_progress as wlogger
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +20,7 @@ def change_language(language):
     logger.debug("Request change language to %s", language)
     try:
         utils.change_language(language.strip())
-        generate_html()
+        generate_html(force=True)
     except Exception as e:
         logger.exception(e)
 
@@ -90,24 +88,16 @@ def get_workspace_data():
 
 
 @eel.expose
-def get_workspace_summary(check_all=False):
+def get_workspace_summary(check_all=False, profile='quick'):
     '''Get list of workspace and testlog'''
+    from lila.ams import FileTxt, Report, Resolver, session
+
     def check(testlog, package):
         try:
-            report = Report(testlog)
-            report.check(package)
+            report = Report(testlog, resolver)
+            report.check(package, profile)
 
-            checklist = report.get_checklist()
-            issue = [i for i in checklist
-                     if i[2] != True and i[0] != 'AMSTB_SrcFile.c']
-
-            if len(issue) > 0:
-                status = '<span class="label label-danger">NG {0}</span>' \
-                    .format(len(issue))
-
-            else:
-                status = '<span class="label label-success">OK {0}</span>' \
-                    .format(len(checklist))
+            status = get_check_status(report.get_checklist())
 
         except Exception as e:
             logger.exception(e)
@@ -152,8 +142,15 @@ def get_workspace_summary(check_all=False):
             tbody = ''
             count = 1
             total = len(data_wsp.get('list_log', []))
+
+            # Each result directory is listed once for all functions
+            resolver = Resolver()
+
+            cost = Report.get_cost(profile)
+            logger.debug("Check %s functions with profile %s, estimate %ss",
+                         total, profile, round(cost * total, 1))
             for _, testlog in data_wsp.get('list_log', []):
-                info = parse.parse_testlog(testlog)
+                info = dict(session.load(FileTxt, testlog).info)
                 summary = db.get_func_info(testlog, pkg_name, level=0)
                 if 'src_rel' in summary:
                     info.update({'src_rel': summary.get('src_rel')})
@@ -204,6 +201,22 @@ def get_workspace_summary(check_all=False):
         return data
 
 
+def get_check_status(checklist):
+    '''Generate status label of checklist'''
+    issue = [i for i in checklist
+             if i[2] != True and i[0] != 'AMSTB_SrcFile.c']
+
+    if len(issue) > 0:
+        status = '<span class="label label-danger">NG {0}</span>' \
+            .format(len(issue))
+
+    else:
+        status = '<span class="label label-success">OK {0}</span>' \
+            .format(len(checklist))
+
+    return status
+
+
 def generate_sum_header(lst_all, lst_show):
     text = ''
     for header in lst_all:
@@ -218,6 +231,9 @@ def generate_sum_header(lst_all, lst_show):
 @eel.expose
 def select_folder():
     '''Ask the user to select a folder'''
+    from tkinter import Tk
+    from tkinter.filedialog import askdirectory
+
     root = Tk()
     root.withdraw()
     root.wm_attributes('-topmost', 1)
@@ -229,6 +245,9 @@ def select_folder():
 @eel.expose
 def select_file(extension):
     """ Ask the user to select a file """
+    from tkinter import Tk
+    from tkinter.filedialog import askopenfilename
+
     root = Tk()
     root.withdraw()
     root.wm_attributes('-topmost', 1)
@@ -245,7 +264,15 @@ def select_file(extension):
 @eel.expose
 def get_coverage_report(testlog):
     '''Get coverage report from testlog'''
-    return parse.parse_testlog(testlog)
+    from lila.ams import FileTxt, session
+
+    try:
+        data = dict(session.load(FileTxt, testlog).info)
+    except Exception as e:
+        logger.exception(e)
+        data = {}
+    finally:
+        return data
 
 
 @eel.expose
@@ -332,12 +359,14 @@ def get_workspace_info(workspace):
 
 
 @eel.expose
-def check_testlog(testlog, package):
+def check_testlog(testlog, package, profile='full'):
     '''Check testlog base on checklist'''
-    logger.debug("Request check testlog %s", testlog)
+    from lila.ams import Report
+
+    logger.debug("Request check testlog %s %s", testlog, profile)
     try:
         report = Report(testlog)
-        report.check(package)
+        report.check(package, profile)
 
     except Exception as e:
         logger.exception(e)
@@ -355,13 +384,16 @@ def check_testlog(testlog, package):
 
         return {
             'checklist': tbl_checklist,
-            'warninglist': tbl_warnlist
+            'warninglist': tbl_warnlist,
+            'status': get_check_status(checklist)
         }
 
 
 @eel.expose
 def deliver_report(info):
     '''Deliver report'''
+    from lila.ams import Report
+
     logger.debug("Deliver report")
     try:
         testlog = info.get('testlog')
@@ -379,6 +411,8 @@ def deliver_report(info):
 @eel.expose
 def deliver_report_update(info):
     '''Deliver report'''
+    from lila.ams import Report
+
     logger.debug("Deliver report")
     try:
         testlog = info.get('testlog')
@@ -394,6 +428,128 @@ def deliver_report_update(info):
         logger.exception(e)
 
 
+# Excel application is shared, COM spec generation runs one at a time
+spec_lock = threading.Lock()
+
+
+@eel.expose
+def deliver_reports(info, update_spec=False):
+    '''Deliver reports of list of testlogs, all testlogs of workspace
+    if no list is given. Reports are delivered in background so that web
+    keeps updating progress, deliverReportsDone of web gets the result'''
+    eel.spawn(run_deliver_reports, info, update_spec)
+
+
+def run_deliver_reports(info, update_spec=False):
+    '''Deliver reports of testlogs in worker threads.
+    Errors of a function do not stop the others'''
+    from lila.ams import Report, Resolver, Session
+
+    # Parsed files fill their tables and columns lazily without lock,
+    # so they are not shared between worker threads
+    local = threading.local()
+
+    def deliver(testlog):
+        # Each worker thread uses its own COM apartment for Excel
+        engine = info.get('engine', utils.load(CONST.SETTING, 'specEngine'))
+        if engine != 'openpyxl':
+            import pythoncom
+            pythoncom.CoInitialize()
+
+        utils.progress.muted = True
+        try:
+            data = get_report_info(testlog, workspace)
+            if data == {}:
+                raise ValueError("No report info")
+
+            options = dict(info)
+            options.update({
+                'testlog': testlog,
+                'target': data.get('dirTarget'),
+                'spec': data.get('dirSpec'),
+                'func_no': data.get('func_no', info.get('func_no')),
+                'issue': issues.get(testlog, data.get('issue')),
+                'package': package
+            })
+
+            if getattr(local, 'session', None) is None:
+                local.session = Session()
+            report = Report(testlog, resolver, local.session)
+            report.deliver_files(options.get('target'))
+
+            if engine == 'openpyxl':
+                report.generate_spec(options, update_spec)
+            else:
+                with spec_lock:
+                    report.generate_spec(options, update_spec)
+
+            filename = '{func}.xlsx'.format(**report.info)
+            if Path(options.get('spec')).joinpath(filename).is_file() is False:
+                raise FileNotFoundError("Spec not found {0}".format(filename))
+        finally:
+            utils.progress.muted = False
+            if engine != 'openpyxl':
+                pythoncom.CoUninitialize()
+
+    logger.debug("Deliver reports")
+    result = {'done': [], 'failed': []}
+    try:
+        workspace = info.get('workspace')
+        wsp = utils.load(CONST.WORKSPACE).get(workspace, {})
+        package = wsp.get('package')
+
+        # Issue of each function, issue of function info by default
+        issues = info.get('issues', {})
+
+        testlogs = info.get('testlogs')
+        if not testlogs:
+            testlogs, _ = utils.scan_files(wsp.get('path'))
+        testlogs = sorted([str(f) for f in testlogs])
+
+        total = len(testlogs)
+        wlogger("Delivering {0} functions", total, 0)
+
+        # Result directories are listed once for all functions
+        resolver = Resolver()
+
+        with ThreadPoolExecutor(CONST.DELIVER_WORKERS) as executor:
+            futures = [executor.submit(deliver, testlog)
+                       for testlog in testlogs]
+            pending = dict(zip(futures, testlogs))
+
+            count = 0
+            while len(pending) > 0:
+                # Waiting yields to web server instead of blocking it
+                eel.sleep(0.2)
+                for future in [f for f in futures if f in pending]:
+                    if future.done() is False:
+                        continue
+
+                    testlog = pending.pop(future)
+                    name = Path(testlog).stem
+                    count += 1
+                    percent = int(count*100 / total)
+                    try:
+                        future.result()
+                        result['done'].append(testlog)
+                        wlogger("{0}/{1} {2}: Done",
+                                [count, total, name], percent)
+                    except Exception as e:
+                        logger.exception(e)
+                        result['failed'].append([testlog, str(e)])
+                        wlogger("Error {0}/{1} {2}: {3}",
+                                [count, total, name, str(e)], percent)
+
+    except Exception as e:
+        logger.exception(e)
+        wlogger("Exception {0}", str(e))
+    finally:
+        wlogger("Delivered {0}, failed {1}",
+                [len(result['done']), len(result['failed'])], 100)
+        eel.deliverReportsDone(result)
+        return result
+
+
 @eel.expose
 def update_package(info, action):
     '''Update package'''
@@ -518,22 +674,40 @@ def close():
     sys.exit()
 
 
-def generate_html():
-    '''Generate html files'''
-    data = utils.get_lang_data('ui')
-    data.update(utils.load(CONST.VERSION))
+def generate_html(force=False):
+    '''Generate html files, pages which are newer than templates, language
+    and version are kept'''
     lst_page = [
         ('workspace.html', 'index.html'),
         ('package.html', 'package.html'),
         ('summary.html', 'summary.html')
     ]
 
+    inputs = [CONST.CONFIG, CONST.VERSION, utils.get_lang_path()]
+    inputs += list(CONST.TEMPLATE.iterdir())
+    latest = max(p.stat().st_mtime_ns for p in inputs if p.is_file())
+
+    def is_current(page):
+        path = CONST.WEB.joinpath(page)
+        return path.is_file() and path.stat().st_mtime_ns > latest
+
+    lst_page = [(template, page) for template, page in lst_page
+                if force is True or is_current(page) is False]
+    if lst_page == []:
+        logger.debug("Html files are current")
+        return
+
+    data = utils.get_lang_data('ui')
+    data.update(utils.load(CONST.VERSION))
+
     for page in lst_page:
         render(data, *page)
 
 
 def render(data, template, path=None, mode='template'):
     '''Render template and write to file'''
+    from jinja2 import Environment, FileSystemLoader, Template
+
     if mode == 'template':
         logger.debug("Render template %s", template)
         env = Environment(loader=FileSystemLoader(str(CONST.TEMPLATE)))
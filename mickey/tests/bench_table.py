@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+'''Time table raw data of large _Table.html and _IO.html.
+
+    python -m tests.bench_table [html ...] [--rows N]
+
+Without html files a table of N rows with br cells is generated'''
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import lxml.html
+
+import lila.ams as ams
+import lila.const as CONST
+from tests.test_ams import round_trip_table
+
+
+def generate(path, nrows):
+    '''Write table like _Table.html with br lines and rowspan'''
+    out = ['<html><head><meta charset="utf-8"></head><body>',
+           '<h4>Test Case [f.csv]</h4><table>',
+           '<tr><td>No.</td><td>Item</td><td>in1</td><td>in2</td>'
+           '<td>out1</td><td>Comment</td></tr>']
+    for r in range(nrows):
+        item = '<td rowspan="2">item{0}</td>'.format(r) if r % 2 == 0 else ''
+        out.append('<tr><td>{0}</td>{1}<td>{0}</td><td>v<b>1</b><br>2</td>'
+                   '<td>0</td><td>a<br>b<br>c</td></tr>'.format(r + 1, item))
+    out.append('</table></body></html>')
+    path.write_text('\n'.join(out), encoding='utf-8')
+
+
+def bench(path):
+    '''Print cost of each step of table raw data'''
+    start = time.perf_counter()
+    obj = ams.Table(path)
+    grid = obj.get_table()
+    parsed = time.perf_counter()
+    obj.get_table_raw(grid)
+    walked = time.perf_counter()
+
+    doc = lxml.html.parse(str(path))
+    grid = ams.Grid(doc.find('.//table'))
+    loaded = time.perf_counter()
+    round_trip_table(obj, grid)
+    done = time.perf_counter()
+
+    print('{0}: {1} rows, {2:.0f} KB'.format(
+        Path(path).name, len(grid), Path(path).stat().st_size / 1024))
+    print('  get_table {0:.3f}s, get_table_raw {1:.3f}s'.format(
+        parsed - start, walked - parsed))
+    print('  round trip {0:.3f}s'.format(done - loaded))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('html', nargs='*')
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        # Cache of other runs is not used
+        CONST.CACHE = Path(temp).joinpath('cache')
+
+        paths = args.html
+        if paths == []:
+            path = Path(temp).joinpath('f_Table.html')
+            generate(path, args.rows)
+            paths = [path]
+
+        for path in paths:
+            bench(path)
+
+
+if __name__ == '__main__':
+    main()
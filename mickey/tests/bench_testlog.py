@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+'''Time check 14 of large testlog.
+
+    python -m tests.bench_testlog [testlog ...] [--size MB] [--func NAME]
+
+Function is parsed from testlog unless it is given. Without testlog files
+one of size MB is generated, the definition of function is at the end
+after calls of longer names'''
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import lila.ams as ams
+from lila import parse
+from tests.test_ams import scan_lines
+
+
+def generate(path, size, func):
+    '''Write testlog which defines func at its end'''
+    lines = ['header'] * 6
+    block = ['  x = other_{0}(a) + 1;'.format(func),
+             '  y = {0}_sub (x);'.format(func),
+             '    #  in1 = 0x0001  out1 = 0x0002',
+             '']
+    count = size * 1024 * 1024 // len('\n'.join(block))
+    lines += block * count
+    lines += ['int {0}(int a)'.format(func), '{', '}']
+    path.write_text('\n'.join(lines) + '\n', encoding='shift-jis')
+
+
+def bench(path, func=None):
+    '''Print cost of check 14 and the previous scan of lines.
+    Function of testlog is parsed if it is not given'''
+    start = time.perf_counter()
+    if func is None:
+        txt = ams.FileTxt(path)
+        func = txt.info['func']
+    else:
+        with mock.patch.object(parse, 'parse_testlog',
+                               lambda *args, **kargs: {'func': func}):
+            txt = ams.FileTxt(path)
+    loaded = time.perf_counter()
+    rst = txt.check_14_func()
+    checked = time.perf_counter()
+
+    found = scan_lines(path, func)
+    scanned = time.perf_counter()
+
+    print('{0}: {1:.1f} MB, found {2} {3}'.format(
+        Path(path).name, Path(path).stat().st_size / 1024 / 1024,
+        rst[0], found))
+    print('  load {0:.3f}s, check_14_func {1:.3f}s'.format(
+        loaded - start, checked - loaded))
+    print('  previous scan {0:.3f}s'.format(scanned - checked))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('testlog', nargs='*')
+    parser.add_argument('--size', type=int, default=20)
+    parser.add_argument('--func')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp:
+        paths = args.testlog
+        if paths == []:
+            args.func = args.func or 'func'
+            path = Path(temp).joinpath('{0}.txt'.format(args.func))
+            generate(path, args.size, args.func)
+            paths = [path]
+
+        for path in paths:
+            bench(path, args.func)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import lxml.html
+
+import lila.ams as ams
+import lila.const as CONST
+from lila import parse, utils
+
+# Cells of br lines, nested tags, rowspan and colspan
+HTML = ''.join([
+    '<html><head><meta charset="utf-8"></head><body>',
+    '<h4>Test Case [f.csv]</h4><table>',
+    '<tr><td rowspan="2">No.</td><td colspan="2">Input</td>',
+    '<td>Output</td></tr>',
+    '<tr><td>a</td><td><b>b</b>/<i>c</i></td><td>x</td></tr>',
+    '<tr><td>1</td><td>0<br>1<br>2</td><td rowspan="2">v<b>1</b><br>',
+    '<span>2<i>3</i></span>4</td><td>テスト<br></td></tr>',
+    '<tr><td>2</td><td colspan="1">a<br><br>b</td><td>-</td></tr>',
+    '<tr><td colspan="2"><br>c</td><td>&lt;x&gt;<br>&amp;</td>',
+    '<td><p>p1</p><p>p2</p></td></tr>',
+    '</table></body></html>'
+])
+
+
+def round_trip(node):
+    '''Lines of cell by the previous repr round trip of get_table_raw'''
+    string = str(lxml.html.tostring(node))
+    if '<br>' not in string:
+        return None
+    string = string.replace('<br>', '\n')[2:-6]
+    string = ''.join(lxml.html.fromstring(string).itertext())
+    return string.splitlines()
+
+
+def round_trip_table(obj, grid):
+    '''Rows of table raw data by the previous round trip of each cell'''
+    row = [None for c in range(grid.ncol)]
+    data = [row[:] for r in range(len(grid))]
+    buff = 0
+    for r in range(len(grid)):
+        rowspan = 1
+        for c in range(grid.ncol):
+            if (r, c) != grid.get_origin(r, c):
+                continue
+            node = grid.cells[grid.get_id(r, c)]
+            lst = round_trip(node)
+            if lst is not None:
+                if len(lst) > rowspan:
+                    for _ in range(rowspan, len(lst)):
+                        data.append(row[:])
+                    rowspan = len(lst)
+                for k in range(len(lst)):
+                    data[r+buff+k][c] = lst[k]
+            else:
+                data[r+buff][c] = obj.get_node(node)
+        buff += (rowspan - 1)
+    return data
+
+
+def scan_lines(path, name):
+    '''Check 14 by the previous scan of each line of testlog'''
+    lst_char = ['+', '-', '/', '=']
+    func1 = ' ' + name
+    func2 = '*' + name
+    for line in utils.read_file(path)[6:]:
+        func = func1
+        if func1 not in line and func2 not in line:
+            continue
+
+        if func2 in line:
+            func = func2
+
+        tmp = [block.strip() for block in line.split(func)]
+        if tmp[1].startswith('(') is False:
+            continue
+        tmp2 = [i.strip() for i in tmp[0].split(' ') if i.strip() != '']
+
+        if set(lst_char) - set(tmp2) == set(lst_char):
+            return True
+    return False
+
+
+class TestTableRaw(unittest.TestCase):
+    '''Table raw data is same as the previous round trip of each cell'''
+
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+
+        cache, stream = CONST.CACHE, CONST.STREAM_SIZE
+        self.addCleanup(setattr, CONST, 'CACHE', cache)
+        self.addCleanup(setattr, CONST, 'STREAM_SIZE', stream)
+        CONST.CACHE = Path(temp.name).joinpath('cache')
+
+        self.path = Path(temp.name).joinpath('f_Table.html')
+        self.path.write_text(HTML, encoding='utf-8')
+
+    def expected(self, obj):
+        '''Table raw data by the previous implementation'''
+        doc = lxml.html.parse(str(self.path))
+        grid = ams.Grid(doc.find('.//table'))
+
+        r0 = [None for c in range(grid.ncol)]
+        r0[0] = obj.get_node(doc.find('.//h4'))
+        return [r0, [None] * grid.ncol] + round_trip_table(obj, grid)
+
+    def test_split_lines(self):
+        doc = lxml.html.parse(str(self.path))
+        grid = ams.Grid()
+        for td in doc.iterfind('.//td'):
+            lines = round_trip(td)
+            self.assertEqual(grid.split_lines(td), lines or [])
+
+    def test_get_table_raw(self):
+        obj = ams.Table(self.path)
+        data = obj.get_table_raw(obj.get_table())
+        self.assertEqual(data, self.expected(obj))
+
+    def test_get_table_raw_stream(self):
+        CONST.STREAM_SIZE = 0
+        obj = ams.Table(self.path)
+        data = obj.get_table_raw(obj.get_table())
+        self.assertEqual(data, self.expected(obj))
+
+        # Lines are kept when html nodes are released to cache
+        obj = ams.Table(self.path)
+        self.assertIsNone(obj.doc)
+        self.assertEqual(obj.get_table_raw(obj.get_table()), data)
+
+
+class TestCheck14(unittest.TestCase):
+    '''Function definition is found same as the previous scan of lines'''
+
+    header = ['h'] * 6
+
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+        self.path = Path(temp.name).joinpath('f.txt')
+
+        patch = mock.patch.object(parse, 'parse_testlog',
+                                  lambda *args, **kargs: {'func': 'func'})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def check(self, lines):
+        '''Result of check 14 and the previous scan on testlog'''
+        self.path.write_text('\n'.join(self.header + lines) + '\n')
+        rst = ams.FileTxt(self.path).check_14_func()
+        return rst, scan_lines(self.path, 'func')
+
+    def test_longer_name(self):
+        lines = ['void other_func(void)', '{', '}', 'int func (int a)', '{']
+        rst, found = self.check(lines)
+        self.assertEqual(rst, (True, ''))
+        self.assertTrue(found)
+
+    def test_only_longer_name(self):
+        lines = ['void other_func(void)', 'x = my_func (1)', 'funcx(a)']
+        rst, found = self.check(lines)
+        self.assertFalse(rst[0])
+        self.assertFalse(found)
+
+    def test_cases(self):
+        cases = [
+            ['int *func(int a)'],
+            ['static void func(void) {'],
+            ['  func(1);'],
+            ['x = func(1);'],
+            ['a + func (b)'],
+            ['func(a)'],
+            ['int func'],
+            ['void other_func(void)', 'int\tfunc(int a)'],
+            ['int func(void)'],
+        ]
+        for lines in cases:
+            with self.subTest(lines=lines):
+                rst, found = self.check(lines)
+                self.assertEqual(rst[0], found)
+
+    def test_header_lines(self):
+        self.header = ['int func(void)'] * 6
+        rst, found = self.check(['x'])
+        self.assertEqual(rst[0], found)
+        self.assertFalse(found)
+
+    def test_random_lines(self):
+        tokens = ['func', 'other_func', '(', ' ', '*', '=', 'int', 'a.',
+                  '\t', 'x', ')', 'funcx', '+']
+        rand = random.Random(1)
+        for _ in range(300):
+            lines = [''.join(rand.choice(tokens)
+                             for _ in range(rand.randint(1, 6)))
+                     for _ in range(4)]
+            rst, found = self.check(lines)
+            self.assertEqual(rst[0], found, lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
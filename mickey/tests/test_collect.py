@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from openpyxl import Workbook, load_workbook
+
+import lila.const as CONST
+from lila import utils
+from lila.collect import Collector, get_summary
+
+SHEET = '38_P33A'
+JP = utils.load(CONST.SETTING, 'jpDict')
+ISSUE = '{0}_{1}No'.format(SHEET, JP['issue'])
+TIME = '2019/11/01 10:00:00'
+FULL = ('100%', '100%', '100%')
+
+
+class Fixture(object):
+    '''Delivered results of 11 functions, each one goes to other branches
+    of checks. Source, result and summary are written under root'''
+
+    summary = [
+        # No, file, group, function, C0, C1, MC/DC
+        (1, 'dir/a.c', 1, 'f1', 1, 1, 1),
+        (2, 'dir/a.c', 1, 'f2', 1, 1, 1),
+        (3, 'dir/a.c', 1, 'f3', 1, 1, 1),
+        (4, 'dir/a.c', 1, 'f4', 1, 1, 1),
+        (5, 'dir/a.c', 1, 'f5', 1, 1, 1),
+        (6, 'dir/b.c', 2, 'f6', 0.955, 1, 0.9),
+        (7, 'dir/b.c', 2, 'f7', 1, 1, 1),
+        (8, 'dir/a.c', 1, 'f8', 0.9, 1, 1),
+        (9, 'dir/a.c', 1, 'f9', 1, 1, 0.5),
+        (10, 'dir2/c.c', 1, 'f10', 1, 1, 1),
+        (11, 'dir/a.c', 1, 'f11', 1, 1, 1)
+    ]
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.source = self.root.joinpath('SRC')
+        self.result = self.root.joinpath('RES')
+        self.xlsx = self.root.joinpath('summary.xlsx')
+
+        self.write_sources()
+        self.write_results()
+        self.write_summary()
+
+    def write(self, path, text, encoding='shift-jis'):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding=encoding)
+
+    def write_sources(self):
+        target = self.source.joinpath('pkg', 'root', 'target')
+        self.write(target.joinpath('dir', 'a.c'), 'int x;\n')
+        self.write(target.joinpath('dir', 'b.c'),
+                   '/* *** Simulink model */\n')
+        self.write(target.joinpath('dir2', 'c.c'), 'int x;\n')
+        self.write(target.joinpath('mcdc', 'dir', 'a.c'), 'x')
+
+    def write_results(self):
+        t1 = 'Task00012_Group1_a.c_X'
+        t2 = 'Task00013_Group2_b.c_Y'
+        t3 = 'Task00014_Group1_c.c_Z'
+        issue = '{0}{1}'.format
+
+        self.add(t1, 'f1', 'dir', 'a.c')
+        self.add(t1, 'f2', 'dir', 'a.c', stub=True, lack=['.ini', '_TC.html'])
+        self.add(t1, 'f4', 'dir', 'a.c')
+        self.add(t2, 'f4', 'dir', 'b.c')
+        self.add(t1, 'f5', 'dir', 'a.c', spec=False)
+        self.add(t2, 'f6', 'dir', 'b.c', sim=True, status='NG',
+                 issue=issue(ISSUE, 6), cov=('95.5%', '100%', '90%'),
+                 stubfile=True)
+        self.add(t2, 'f7', 'dir', 'b.c', status='NG', issue=issue(ISSUE, 3),
+                 spec_time='2019/11/02 10:00:00', full=False)
+        self.add(t1, 'f8', 'dir', 'a.c', issue='XYZ',
+                 spec_cov=('90%', '100%', '100%'),
+                 tcs=[('OK', 1), ('Fault', 2), ('OK', 4)])
+        self.add(t1, 'f9', 'dir', 'a.c', stub=True, stubfile=True,
+                 result_cov=('99%', '100%', '100%'), attr=False,
+                 spec_dir='other', csv_name='zz.csv')
+        self.add(t3, 'f10', 'dir2', 'c.c',
+                 spec_tcs=[('OK', 1), ('OK', 2), ('OK', 3)])
+        self.add(t1, 'f11', 'dir', 'a.c', issue='', lack=['.txt'])
+
+    def add(self, task, func, src_dir, src_name, lack=(), stub=False,
+            stubfile=False, sim=False, cov=FULL, tcs=None, attr=True,
+            spec=True, **kargs):
+        '''Write result files and spec of function'''
+        path = self.result.joinpath(task, JP['dirresult'], func)
+        name = '{0}/{1}/{2}'.format(src_dir, src_name, func)
+        tcs = tcs or [('OK', 1), ('OK', 2)]
+
+        def write(ext, text):
+            if ext not in lack:
+                self.write(path.joinpath(func + ext), text)
+
+        lines = ['mod,"{0}","{1}"'.format(
+            name, 'Simulink model' if sim else name)]
+        if stub:
+            lines.append('%,"AMSTB_foo",1')
+        write('.csv', '\n'.join(lines) + '\n')
+        for ext in ['.ini', '.xeat', '.xtct']:
+            write(ext, 'x')
+        if stubfile:
+            self.write(path.joinpath('AMSTB_SrcFile.c'), 'x')
+
+        for ext in ['_IE.html', '_OE.html', '_IO.html', '_TC.html']:
+            write(ext, '<html></html>')
+        rows = ['<TR><TH class="head">No.</TH><TH class="head">{0}</TH>'
+                '<TH class="head">Confirmation</TH></TR>'.format(
+                    'Attribute' if attr else 'Attr')]
+        rows += ['<TR><TD class="data-no">-{0:03d}</TD><TD class="data">x'
+                 '</TD><TD class="data-confir">{1}</TD></TR>'.format(n, conf)
+                 for conf, n in tcs]
+        write('_Table.html', '<html><body><h4>t</h4>\n<TABLE>\n{0}\n'
+              '</TABLE>\n</body></html>\n'.format('\n'.join(rows)))
+
+        write('.txt', '\n'.join(self.get_testlog(name, cov, TIME)) + '\n')
+
+        if spec:
+            self.add_spec(task, func, src_dir, src_name, tcs=tcs, attr=attr,
+                          cov=cov, **kargs)
+
+    def get_testlog(self, name, cov, time):
+        return [
+            'Function name : {0}'.format(name),
+            'C0 Coverage rate : {0}'.format(cov[0]),
+            'C1 Coverage rate : {0}'.format(cov[1]),
+            'MC/DC Coverage rate : {0}'.format(cov[2]),
+            'Test time : {0}'.format(time)
+        ]
+
+    def add_spec(self, task, func, src_dir, src_name, tcs, attr, cov,
+                 status='OK', issue=JP['noissue'], full=True, spec_dir=None,
+                 spec_cov=None, spec_time=TIME, spec_tcs=None,
+                 result_cov=None, csv_name=None):
+        '''Write unit test specification of function from template'''
+        wb = load_workbook(CONST.SPEC)
+        spec_cov = spec_cov or cov
+
+        ws = wb.worksheets[1]
+        ws['F8'] = spec_dir or src_dir
+        ws['F9'] = src_name
+        ws['F10'] = func
+        ws['F11'] = csv_name or '{0}.csv'.format(func)
+        ws['F12'] = JP['result'].format(
+            confirm=status, issue=issue,
+            **dict(zip(['c0', 'c1', 'mcdc'], result_cov or spec_cov)))
+
+        ws = wb.worksheets[5]
+        ws.delete_rows(1, ws.max_row)
+        ws.append(['No.', 'Test Analysis Item', 'Decision',
+                   'Attribute' if attr else 'Attr', 'ID', 'Comment',
+                   'Input', 'Output', 'Check', 'Match', 'Confirmation'])
+        for conf, n in spec_tcs or tcs:
+            ws.append([-n, 'item', '', '', '', '', '1', '2', '', '', conf])
+
+        ws = wb.worksheets[6]
+        ws.delete_rows(1, ws.max_row)
+        name = '{0}/{1}/{2}'.format(src_dir, src_name, func)
+        lines = [JP['testlog_intro'], '', '', '']
+        lines += self.get_testlog(name, spec_cov, spec_time)
+        if full:
+            lines += ['', 'void {0}(void)'.format(func)]
+        for line in lines:
+            ws.append([line])
+
+        path = self.result.joinpath(task, JP['dirspec'], func + '.xlsx')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        wb.save(path)
+
+    def write_summary(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = SHEET
+        ws.append(['Summary'])
+        ws.append([])
+        ws.append(['No.', 'File', 'Group', 'Function', 'LOC', 'PIC',
+                   'Peer Review', 'Vol', 'Result', 'C0', 'C1', 'MC/DC',
+                   'Release Phase', 'Findings Description'])
+        for no, src, group, func, c0, c1, mcdc in self.summary:
+            ws.append([no, src, group, func, 10, 'pic', 'rv', 1, 'OK',
+                       c0, c1, mcdc, 1, ''])
+        ws.append([])
+        ws.append(['LOCs per Group', 1])
+        wb.save(self.xlsx)
+
+
+class TestCollect(unittest.TestCase):
+    '''Status of each check branch, same as script_collect_result.sh'''
+
+    expected = {
+        'f1': 'OK,OK,OK,OK,OK,NONSTUB_OK,OK,OK,OK,OK,OK,OK,OK,OK,OK,OK,OK',
+        'f2': 'OK,OK_CSV_OTHER_NG,OK,OK_LACK_FILE,OK,STUB_NG,OK,OK,OK,OK,OK,'
+              'OK,OK,NOT_RUN,OK,NOT_RUN,OK',
+        'f3': 'NOT_FOUND_DIR' + ',NOT_RUN' * 16,
+        'f4': 'DUPLICATE_FUNC' + ',NOT_RUN' * 16,
+        'f5': 'OK,OK,OK,OK,OK,NONSTUB_OK,NG' + ',NOT_RUN' * 10,
+        'f6': 'OK,OK,OK,OK,OK,NONSTUB_NG,OK,OK,OK,OK,OK,OK,OK,OK,OK,OK,OK',
+        'f7': 'OK,OK,NG_0,OK,OK,NONSTUB_OK,OK,OK,OK,OK,OK,NG_WRONG_ID_3,'
+              'TIME_NG_COV_SPEC_N_TXT_2019/11/02_10:00:00,OK,OK,OK,NG',
+        'f8': 'OK,OK,OK,OK,OK,NONSTUB_OK,OK,OK,OK,OK,OK,NG_STATUS_XYZ,'
+              'PERCENT_NG_COV_SPEC_N_TXT_90%_100%_100%,OK,NG,OK,OK',
+        'f9': 'OK,OK,OK,OK,OK,STUB_OK,OK,NG,OK,OK,NG,OK,'
+              'PERCENT_NG_RESULT_SPEC_N_TXT_99%_100%_100%,NG,OK,OK,OK',
+        'f10': 'OK,OK,OK,OK,OK,NONSTUB_OK,OK,OK,OK,OK,OK,OK,OK,OK,NG,NG,OK',
+        'f11': 'OK,OK,OK,OK,NG,NONSTUB_OK,OK,OK,OK,OK,OK,'
+               'NG_NOT_FIND_LABEL_BUG_REPORT_,'
+               'TIME_NG_COV_SPEC_N_TXT_2019/11/01_10:00:00,OK,OK,OK,OK'
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp = tempfile.TemporaryDirectory()
+        cls.fixture = Fixture(cls.temp.name)
+        cls.functions = get_summary(cls.fixture.xlsx, SHEET)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp.cleanup()
+
+    def collect(self, ng_only=False):
+        '''Report lines of functions by name'''
+        fixture = self.fixture
+        collector = Collector(fixture.result, SHEET, str(fixture.source))
+        lines = list(collector.collect(self.functions, ng_only))
+        self.assertEqual(lines[0], ','.join(Collector.columns))
+        return dict(line.split(',', 1) for line in lines[1:])
+
+    def test_summary(self):
+        self.assertEqual([info['func'] for info in self.functions],
+                         list(self.expected.keys()))
+
+    def test_status(self):
+        lines = self.collect()
+        self.assertEqual(list(lines.keys()), list(self.expected.keys()))
+        for func, status in self.expected.items():
+            with self.subTest(func=func):
+                self.assertEqual(lines[func], status)
+
+    def test_ng_only(self):
+        # Bug report without label or with wrong id is not NG, f11 is NG of
+        # testlog. Missing and duplicate directories are NG unlike script
+        lines = self.collect(ng_only=True)
+        self.assertEqual(sorted(lines.keys(), key=lambda f: int(f[1:])),
+                         ['f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8', 'f9',
+                          'f10', 'f11'])
+        for func, status in lines.items():
+            self.assertEqual(status, self.expected[func])
+
+    def test_error(self):
+        with mock.patch('lila.collect.Function', side_effect=KeyError), \
+                self.assertLogs('lila.collect', 'ERROR'):
+            lines = self.collect()
+        self.assertEqual(lines['f1'], ','.join(['ERROR'] * 17))
+
+
+if __name__ == '__main__':
+    unittest.main()
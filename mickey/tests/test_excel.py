@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+import lila.const as CONST
+from lila.excel import ExcelWin32, ExcelXlsx, Template
+
+# Expected sheets after each macro, set UPDATE_GOLDEN=1 to write them again.
+# Set RECORD_GOLDEN=1 on Windows to record them by the macros in Excel
+GOLDEN = Path(__file__).parent.joinpath('golden')
+RECORD = os.environ.get('RECORD_GOLDEN') == '1'
+
+
+class TestTemplate(unittest.TestCase):
+    '''Specs generated from the template kept in memory'''
+
+    def setUp(self):
+        self.temp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp.cleanup)
+
+    def new_spec(self, name):
+        '''New spec from template, the second one is loaded from memory'''
+        path = Path(self.temp.name).joinpath(name)
+        return ExcelXlsx(path, CONST.SPEC)
+
+    def test_fill_rows(self):
+        for name in ['f1.xlsx', 'f2.xlsx']:
+            xlsx = self.new_spec(name)
+            sheet = xlsx.tool['SHEET_NAME_RESULT']
+            stubs = [['sub1', 'stub1'], ['sub2', '-'], ['sub3', 'stub3']]
+            values = [['v1', '0'], ['v2', '1']]
+            tcs = [['a', '1,2'], ['b', '3']]
+
+            params = [
+                ('Fill_Table_1_4', ['spec', sheet, 'B46', stubs]),
+                ('Fill_Table_1_3', ['spec', sheet, 'B38', values]),
+                ('Fill_Table_1_2', ['spec', sheet, 'B17', 1, tcs])
+            ]
+            for cmd, param in params:
+                self.assertEqual(xlsx.run(sheet, cmd, param), 'vba_ok')
+            xlsx.close()
+
+            ws = ExcelXlsx(xlsx.path).get_sheet(sheet)
+            values = [c.value for r in ws.iter_rows() for c in r]
+            for value in ['sub1', 'sub2', 'sub3', 'stub3', 'v1', 'v2',
+                          'a', 'b', '1,2', '3']:
+                self.assertIn(value, values)
+
+    def test_clone(self):
+        template = Template()
+        template.load(CONST.SPEC)
+
+        begin = time.perf_counter()
+        for _ in range(5):
+            clone = template.load(CONST.SPEC)
+        cost = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        for _ in range(5):
+            wb = load_workbook(CONST.SPEC)
+        cost_load = time.perf_counter() - begin
+
+        # Clone is a copy of parsed workbook instead of parsing again
+        self.assertLess(cost * 3, cost_load)
+
+        self.assertEqual(clone.sheetnames, wb.sheetnames)
+        for ws, ws_load in zip(clone.worksheets, wb.worksheets):
+            self.assertEqual([[c.value for c in r] for r in ws.iter_rows()],
+                             [[c.value for c in r]
+                              for r in ws_load.iter_rows()])
+            self.assertEqual(sorted(map(str, ws.merged_cells.ranges)),
+                             sorted(map(str, ws_load.merged_cells.ranges)))
+            self.assertEqual(
+                {r: d.height for r, d in ws.row_dimensions.items()},
+                {r: d.height for r, d in ws_load.row_dimensions.items()})
+
+            # Dimensions of new rows and columns are created on sheet
+            self.assertIs(ws.row_dimensions[ws.max_row + 10].parent, ws)
+            self.assertIs(ws.column_dimensions['ZZ'].parent, ws)
+
+
+class ExcelRecorder(object):
+    '''Run the macros of vba.xlsm in Excel with sources of ExcelXlsx.
+    Html data and coverage lines are written to files for the macros'''
+
+    def __init__(self, xlsx):
+        self.path = Path(xlsx)
+        self.tool = ExcelXlsx(CONST.SPEC).tool
+        shutil.copy(CONST.SPEC, str(self.path))
+        self.excel = ExcelWin32(str(self.path.absolute()))
+
+    @property
+    def wb(self):
+        '''Workbook saved by Excel'''
+        self.excel.wb.Save()
+        return load_workbook(self.path)
+
+    def get_sheet(self, name):
+        return self.wb[name]
+
+    def run(self, sheet, cmd, params):
+        params = list(params)
+        if cmd == 'Import_HTML_File':
+            params[3:] = [self.write_html(*params[3:])]
+        elif cmd == 'Import_Coverage_File':
+            params[3] = self.write_file('cov.txt', '\n'.join(params[3]))
+        elif cmd == 'Import_StubFile':
+            params[3] = self.write_file(Path(params[3]).name, '')
+        return self.excel.run(sheet or self.tool['SHEET_NAME_RESULT'],
+                              cmd, params)
+
+    def close(self):
+        self.excel.close()
+        self.excel.excel.Quit()
+
+    def write_file(self, name, text):
+        path = self.path.parent.joinpath(name)
+        path.write_text(text, encoding='utf-8')
+        return str(path.absolute())
+
+    def write_html(self, data, merges=()):
+        '''Html of table raw data, title h4 and table from row 3'''
+        spans, covered = {}, set()
+        for r1, c1, r2, c2 in merges:
+            spans[r1, c1] = (r2 - r1 + 1, c2 - c1 + 1)
+            covered.update((r, c) for r in range(r1, r2 + 1)
+                           for c in range(c1, c2 + 1))
+
+        rows = []
+        for r in range(2, len(data)):
+            tds = []
+            for c, value in enumerate(data[r]):
+                if (r, c) in covered and (r, c) not in spans:
+                    continue
+                rowspan, colspan = spans.get((r, c), (1, 1))
+                tds.append('<td rowspan="{0}" colspan="{1}">{2}</td>'.format(
+                    rowspan, colspan, value or ''))
+            rows.append('<tr>{0}</tr>'.format(''.join(tds)))
+
+        html = '<html><body><h4>{0}</h4><table>{1}</table></body></html>'
+        return self.write_file('data.html', html.format(data[0][0],
+                                                        ''.join(rows)))
+
+
+class TestMacros(unittest.TestCase):
+    '''Sheets after each macro of vba.xlsm are same as golden files'''
+
+    # Table raw data of html, header is row 4 and testcases from row 5
+    html = [
+        ['Test Case [f.csv]', None, None, None],
+        [None, None, None, None],
+        ['No.', 'Input', None, 'Output'],
+        [None, 'a', 'b', 'x'],
+        ['1', '0', '1', '2'],
+        ['2', '1', '', '3'],
+        ['Description', 'check a', None, 'check x']
+    ]
+    merges = [(2, 0, 3, 0), (2, 1, 2, 2), (6, 1, 6, 2)]
+
+    stubs = [['sub1', 'stub1'], ['sub2', '-'], ['sub3', 'stub3']]
+    values = [['v1', '0'], ['v2', '1']]
+
+    def setUp(self):
+        temp = tempfile.TemporaryDirectory()
+        self.addCleanup(temp.cleanup)
+
+        path = Path(temp.name).joinpath('f.xlsx')
+        if RECORD:
+            self.xlsx = ExcelRecorder(path)
+            self.addCleanup(self.xlsx.close)
+        else:
+            self.xlsx = ExcelXlsx(path, CONST.SPEC)
+        self.tool = self.xlsx.tool
+        self.spec = self.tool['SHEET_NAME_RESULT']
+        self.table = self.tool['SHEET_NAME_TABLE']
+        self.io = self.tool['SHEET_NAME_IO']
+        self.cov = self.tool['SHEET_NAME_COV']
+
+    def run_macro(self, cmd, *params):
+        sheet = params[0] if params else ''
+        self.assertEqual(self.xlsx.run(sheet, cmd, ['f.xlsx'] + list(params)),
+                         'vba_ok')
+
+    def snapshot(self, *sheets):
+        '''Values, merged ranges and conditional formats of sheets'''
+        data = {}
+        for sheet in sheets:
+            ws = self.xlsx.get_sheet(sheet)
+            data[sheet] = {
+                'cells': {c.coordinate: c.value for r in ws.iter_rows()
+                          for c in r if c.value is not None},
+                'merged': sorted(str(m) for m in ws.merged_cells.ranges),
+                'formats': sorted([str(f.sqref), r.formula]
+                                  for f in ws.conditional_formatting
+                                  for r in f.rules)
+            }
+        return data
+
+    def assertGolden(self, name, *sheets):
+        data = json.loads(json.dumps(self.snapshot(*sheets)))
+        path = GOLDEN.joinpath('{0}.json'.format(name))
+        if RECORD or os.environ.get('UPDATE_GOLDEN') == '1':
+            GOLDEN.mkdir(exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as fp:
+                json.dump(data, fp, ensure_ascii=False, indent=1)
+
+        with open(path, encoding='utf-8') as fp:
+            self.assertEqual(data, json.load(fp))
+
+    def test_clear_sheet_html(self):
+        self.run_macro('Import_HTML_File', self.table, 'A1', self.html,
+                       self.merges)
+        self.run_macro('Fmt_correction', self.table, 'TC')
+        self.run_macro('Import_Coverage_File', self.cov, 'A5', ['l1', 'l2'])
+        self.run_macro('Clear_Sheet_html')
+        self.assertGolden('clear_sheet_html', self.table, self.cov)
+
+    def test_clear_table_1_4(self):
+        self.run_macro('Fill_Table_1_4', self.spec, 'B46', self.stubs)
+        self.run_macro('Clear_SHEET_NAME_RESULT_Table_1_4')
+        self.assertGolden('clear_table_1_4', self.spec)
+
+    def test_clear_table_1_3(self):
+        self.run_macro('Fill_Table_1_3', self.spec, 'B38', self.values)
+        self.run_macro('Clear_SHEET_NAME_RESULT_Table_1_3')
+        self.assertGolden('clear_table_1_3', self.spec)
+
+    def test_import_html(self):
+        self.run_macro('Import_HTML_File', self.table, 'A1', self.html,
+                       self.merges)
+        self.assertGolden('import_html', self.table)
+
+    def test_import_coverage(self):
+        lines = ['line1', '  line2', '']
+        self.run_macro('Import_Coverage_File', self.cov, 'A5', lines)
+        self.assertGolden('import_coverage', self.cov)
+
+    def test_import_stub(self):
+        self.run_macro('Import_StubFile', self.spec, 'B53', 'x/AMSTB_Src.c')
+        self.assertGolden('import_stub', self.spec)
+
+    def test_fmt_correction(self):
+        self.run_macro('Import_HTML_File', self.table, 'A1', self.html,
+                       self.merges)
+        self.run_macro('Fmt_correction', self.table, 'TC')
+        self.assertGolden('fmt_correction', self.table)
+
+    def test_fmt_correction_no_testcase(self):
+        self.run_macro('Import_HTML_File', self.table, 'A1', self.html[:4],
+                       self.merges[:2])
+        self.run_macro('Fmt_correction', self.table, 'TC')
+        self.run_macro('Clear_Sheet_html')
+        self.run_macro('Fmt_correction', self.table, 'TC')
+        ws = self.xlsx.get_sheet(self.table)
+        self.assertEqual(list(ws.conditional_formatting), [])
+
+    def test_remove_row_description(self):
+        self.run_macro('Import_HTML_File', self.io, 'A1', self.html,
+                       self.merges)
+        self.run_macro('Remove_Row_Description', self.io)
+        self.assertGolden('remove_row_description', self.io)
+
+    def test_fill_table_1_4(self):
+        self.run_macro('Fill_Table_1_4', self.spec, 'B46', self.stubs)
+        self.assertGolden('fill_table_1_4', self.spec)
+
+    def test_fill_table_1_4_fields(self):
+        data = [['sub1'], ['sub2', 'stub2', 'more'], []]
+        self.run_macro('Fill_Table_1_4', self.spec, 'B46', data)
+        self.assertGolden('fill_table_1_4_fields', self.spec)
+
+    def test_fill_table_1_3(self):
+        self.run_macro('Fill_Table_1_3', self.spec, 'B38', self.values)
+        self.assertGolden('fill_table_1_3', self.spec)
+
+    def test_fill_table_1_2(self):
+        self.run_macro('Fill_Table_1_2', self.spec, 'B17', 1,
+                       [['a', '1,2'], ['b', '3']])
+        self.run_macro('Fill_Table_1_2', self.spec, 'B17', 10,
+                       [['c', '4'], ['d', '5'], ['e', '6']])
+        self.assertGolden('fill_table_1_2', self.spec)
+
+    def test_fill_cell(self):
+        self.run_macro('Fill_cell', self.spec, 'F8', 'func')
+        self.assertEqual(self.xlsx.wb[self.spec]['F8'].value, 'func')
+
+    @unittest.skipIf(RECORD, 'Sheet views are set on saved workbook')
+    def test_reset_pointer(self):
+        self.xlsx.wb.active = 2
+        self.run_macro('Fill_fault_conditional_format_n_reset_pointer')
+        self.assertEqual(self.xlsx.wb.index(self.xlsx.wb.active), 0)
+        for k, ws in enumerate(self.xlsx.wb.worksheets):
+            view = ws.sheet_view
+            self.assertEqual(view.zoomScale, 100)
+            self.assertEqual(view.topLeftCell, 'A1')
+            self.assertEqual(view.selection[0].activeCell, 'A1')
+            self.assertEqual(view.tabSelected, k == 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
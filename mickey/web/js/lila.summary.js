@@ -42,14 +42,19 @@ var SummaryHome = {
         s1.table.on("click", ".sync", async function() {
             var testlog = $(this).attr("path");
             var package = s1.workspace.find("option:selected").attr("package");
+            var row = $(this).closest("tr");
 
             $("#s2-warning-tbl tbody").remove();
             SummaryModal.invoke();
 
-            var data = await eel.check_testlog(testlog, package)();
+            // Upgrade row to full check
+            var data = await eel.check_testlog(testlog, package, "full")();
             if (data.warninglist != undefined) {
                 $("#s2-warning-tbl").append(data.warninglist);
             }
+            if (data.status != undefined) {
+                row.children("td").eq(6).html(data.status);
+            }
             s2.wait.hide();
         });
     },
@@ -306,6 +306,7 @@ var ReportModal = {
         funcNo: $("#a4-func-no"),
         btnUpdate: $("#a4-btn-update"),
         btnCreateNew: $("#a4-btn-create-new"),
+        btnDeliverAll: $("#a4-btn-deliver-all"),
         btnTarget: $("#a4-btn-target"),
         btnSpec: $("#a4-btn-spec")
     },
@@ -374,6 +375,23 @@ var ReportModal = {
             a5.btnClose.show();
         });
 
+        a4.btnDeliverAll.on("click", async function() {
+            // Issue of each function is taken from its function info
+            var info = {
+                workspace: a1.workspace.val(),
+                template: a4.template.val()
+            };
+
+            a4.modal.modal("toggle");
+
+            a5.progressBar.addClass("active progress-bar-striped");
+            ReportProgressModal.invoke();
+            a5.btnClose.hide();
+
+            // Progress modal is closed by deliverReportsDone
+            await eel.deliver_reports(info, false)();
+        });
+
     },
 
     invoke: async function() {
@@ -487,6 +505,13 @@ function updateReportProgress(msg, percent) {
     ReportProgressModal.updateProgressBar(percent);
 }
 
+// Delivering reports of workspace is done
+eel.expose(deliverReportsDone);
+function deliverReportsDone(result) {
+    a5.progressBar.removeClass("active progress-bar-striped");
+    a5.btnClose.show();
+}
+
 eel.expose(askLoginInfo);
 function askLoginInfo() {
     AuthModal.invoke();